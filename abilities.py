@@ -0,0 +1,364 @@
+"""
+Executable monster special abilities
+
+Monster.special_abilities holds display strings such as "Regeneration 5"
+or "Poison: DC 14 Fort save or 1d4 STR damage". compile_abilities() parses
+them once into typed effects, and build_hooks() sorts a fight's effects
+into a dispatch table by when they run:
+
+    pre_round   before anyone acts (e.g. breath weapons)
+    on_hit      after the monster hits the player (e.g. poison)
+    post_round  after everyone has acted (e.g. regeneration)
+
+Strings that describe no mechanical effect ("Undead: immune to
+mind-affecting", "Fly: ...") compile to nothing, so fights without
+abilities pay nothing.
+"""
+import re
+
+import dice
+
+PHASES = ('pre_round', 'on_hit', 'post_round')
+
+SAVE_NAMES = {'fort': 'fortitude', 'ref': 'reflex', 'will': 'will'}
+ABILITY_NAMES = {
+    'str': 'strength', 'dex': 'dexterity', 'con': 'constitution',
+    'int': 'intelligence', 'wis': 'wisdom', 'cha': 'charisma',
+}
+
+# How long poison's ability damage lasts (see effects.duration_rounds)
+POISON_DURATION = "1 minute"
+
+_REGENERATION_RE = re.compile(r'^\s*regeneration\s+(\d+)', re.IGNORECASE)
+_POISON_RE = re.compile(
+    r'^\s*poison\s*:\s*dc\s*(\d+)\s+(fort|ref|will)\w*\s+save\s+or\s+(\S+)\s+'
+    r'(str|dex|con|int|wis|cha)\w*\s+damage', re.IGNORECASE)
+_BREATH_RE = re.compile(
+    r'^\s*breath\s+weapon(?:\s*:\s*(\S+)\s+(\w+)\s+damage)?'
+    r'(?:\s*,\s*(fort|ref|will)\w*\s+dc\s*(\d+)\s+for\s+half)?', re.IGNORECASE)
+
+# Compiled effects keyed by the tuple of ability strings
+_COMPILED = {}
+
+
+class Regeneration:
+    """Heals a fixed amount at the end of every round while alive"""
+    
+    phase = 'post_round'
+    
+    def __init__(self, amount):
+        self.amount = amount
+    
+    def apply(self, hook, target, round_number, log=None):
+        monster = hook.monster
+        if not monster.is_alive():
+            return
+        before = monster.current_hp
+        monster.heal(self.amount)
+        if log is not None and monster.current_hp > before:
+            log.append(f"{monster.name} regenerates {monster.current_hp - before} HP.")
+    
+    def apply_kind(self, hook, target, round_number, log=None, hits=1):
+        table = hook.table
+        rows = hook.rows[table.current_hp[hook.rows] > 0]
+        before = table.current_hp[rows]
+        after = dice.np.minimum(before + self.amount, table.max_hp[rows])
+        table.current_hp[rows] = after
+        if log is not None:
+            healed = int((after - before).sum())
+            if healed:
+                log.append(f"{int((after > before).sum())} x {hook.name} regenerate {healed} HP.")
+
+
+class Poison:
+    """
+    On a hit, the target saves or loses points of an ability score.
+    The loss is a timed effect on the target's timeline and wears off
+    after the duration (or when combat ends).
+    """
+    
+    phase = 'on_hit'
+    
+    def __init__(self, dc, save, damage, ability, duration=POISON_DURATION):
+        self.dc = dc
+        self.save = save
+        self.damage = dice.parse(damage)
+        self.ability = ability
+        self.duration = duration
+    
+    def apply(self, hook, target, round_number, log=None):
+        if target.saving_throw(self.save) >= self.dc:
+            if log is not None:
+                log.append(f"{target.name} resists the poison.")
+            return
+        loss = self.damage.roll(hook.monster.rng)
+        self._drain(target, loss)
+        if log is not None:
+            log.append(f"{target.name} is poisoned and loses {loss} {self.ability}!")
+    
+    def apply_kind(self, hook, target, round_number, log=None, hits=1):
+        rng = hook.table.rng
+        saves = dice.d20_many(hits, getattr(target, self.save + '_save'), rng)
+        failed = int((saves < self.dc).sum())
+        loss = int(dice.roll_expr_many(self.damage, failed, rng).sum()) if failed else 0
+        if failed:
+            self._drain(target, loss)
+        if log is not None:
+            if not failed:
+                log.append(f"{target.name} resists the poison.")
+            else:
+                log.append(f"{target.name} resists {hits - failed} of {hits} poisonings "
+                           f"and loses {loss} {self.ability}!")
+    
+    def _drain(self, target, loss):
+        """Lower the ability score by loss (never below 1)"""
+        score = getattr(target, self.ability)
+        change = max(1, score - loss) - score
+        timeline = getattr(target, 'effects', None)
+        if timeline is None:
+            setattr(target, self.ability, score + change)
+        elif change:
+            timeline.add("Poison", target, {self.ability: change}, self.duration)
+
+
+class BreathWeapon:
+    """
+    Area attack at the start of the round, usable again 1d4 rounds later.
+    A successful save halves the damage.
+    """
+    
+    phase = 'pre_round'
+    
+    def __init__(self, damage="2d6", damage_type="fire", save='reflex', dc=12, recharge="1d4"):
+        self.damage = dice.parse(damage)
+        self.damage_type = damage_type
+        self.save = save
+        self.dc = dc
+        self.recharge = dice.parse(recharge)
+    
+    def apply(self, hook, target, round_number, log=None):
+        monster = hook.monster
+        if round_number < hook.ready_round or not monster.is_alive():
+            return
+        hook.ready_round = round_number + 1 + self.recharge.roll(monster.rng)
+        
+        damage = self.damage.roll(monster.rng)
+        saved = target.saving_throw(self.save) >= self.dc
+        if saved:
+            damage //= 2
+        target.take_damage(damage)
+        if log is not None:
+            if saved:
+                result = f"{target.name} dodges! Takes {damage} {self.damage_type} damage (halved)."
+            else:
+                result = f"{target.name} takes {damage} {self.damage_type} damage!"
+            log.append(f"{monster.name} uses its breath weapon! {result}")
+    
+    def apply_kind(self, hook, target, round_number, log=None, hits=1):
+        table = hook.table
+        rng = table.rng
+        ready = dice.np.flatnonzero((table.current_hp[hook.rows] > 0)
+                                    & (hook.ready_round <= round_number))
+        if not ready.size:
+            return
+        hook.ready_round[ready] = (round_number + 1
+                                   + dice.roll_expr_many(self.recharge, ready.size, rng))
+        
+        damage = dice.roll_expr_many(self.damage, ready.size, rng)
+        saved = dice.d20_many(ready.size, getattr(target, self.save + '_save'), rng) >= self.dc
+        total = int(dice.np.where(saved, damage // 2, damage).sum())
+        target.take_damage(total)
+        if log is not None:
+            log.append(f"{ready.size} x {hook.name} use their breath weapons! {target.name} "
+                       f"takes {total} {self.damage_type} damage ({int(saved.sum())} halved).")
+
+
+class Hook:
+    """One monster's effect in a fight, with the effect's per-fight state"""
+    
+    __slots__ = ('monster', 'effect', 'ready_round')
+    
+    def __init__(self, monster, effect):
+        self.monster = monster
+        self.effect = effect
+        self.ready_round = 1
+    
+    def run(self, target, round_number, log=None, hits=1):
+        """Apply the effect (hits is only used by KindHook)"""
+        self.effect.apply(self, target, round_number, log)
+    
+    def reset(self):
+        """Reset per-fight state for a new fight"""
+        self.ready_round = 1
+
+
+class KindHook:
+    """
+    One monster kind's effect in a MonsterTable fight.
+    
+    The effect runs once per round for every row of the kind, over the
+    table's columns, and per-row state (breath weapon recharge) is an
+    array aligned with rows.
+    """
+    
+    __slots__ = ('table', 'name', 'rows', 'effect', 'ready_round')
+    
+    def __init__(self, table, kind, effect):
+        self.table = table
+        self.name = table.prototypes[kind].name
+        self.rows = dice.np.flatnonzero(table.kind == kind)
+        self.effect = effect
+        self.ready_round = dice.np.ones(self.rows.size, dtype=dice.np.int64)
+    
+    def run(self, target, round_number, log=None, hits=1):
+        """Apply the effect for the whole kind (hits: on_hit hits to resolve)"""
+        self.effect.apply_kind(self, target, round_number, log, hits)
+    
+    def reset(self):
+        """Reset per-fight state for a new fight"""
+        self.ready_round.fill(1)
+
+
+def parse_ability(text):
+    """
+    Parse one special ability string.
+    
+    Args:
+        text: Ability string, e.g. "Regeneration 5: heals 5 HP per round"
+    
+    Returns:
+        Effect instance, or None for purely descriptive abilities
+    """
+    match = _REGENERATION_RE.match(text)
+    if match:
+        return Regeneration(int(match.group(1)))
+    
+    match = _POISON_RE.match(text)
+    if match:
+        dc, save, damage, ability = match.groups()
+        return Poison(int(dc), SAVE_NAMES[save.lower()], damage, ABILITY_NAMES[ability.lower()])
+    
+    match = _BREATH_RE.match(text)
+    if match:
+        damage, damage_type, save, dc = match.groups()
+        kwargs = {}
+        if damage:
+            kwargs.update(damage=damage, damage_type=damage_type.lower())
+        if save:
+            kwargs.update(save=SAVE_NAMES[save.lower()], dc=int(dc))
+        return BreathWeapon(**kwargs)
+    return None
+
+
+def compile_abilities(special_abilities):
+    """
+    Compile a monster's ability strings into effects (memoized).
+    
+    Args:
+        special_abilities: List of ability strings
+    
+    Returns:
+        Tuple of effect instances (empty if none have mechanical effects)
+    """
+    key = tuple(special_abilities)
+    effects = _COMPILED.get(key)
+    if effects is None:
+        effects = _COMPILED[key] = tuple(
+            effect for effect in map(parse_ability, key) if effect is not None)
+    return effects
+
+
+def build_hooks(monsters):
+    """
+    Build the dispatch table for a fight.
+    
+    A MonsterTable gets one KindHook per effect of each monster kind, so
+    the cost per round does not grow with the number of rows.
+    
+    Args:
+        monsters: Monsters in the fight (a list or MonsterTable)
+    
+    Returns:
+        Dictionary with 'pre_round' and 'post_round' lists of hooks, an
+        'on_hit' dict of monster (kind index for a MonsterTable) -> list of
+        hooks, and 'by_kind', or None when no monster has an executable
+        ability
+    """
+    prototypes = getattr(monsters, 'prototypes', None)
+    if not any(compile_abilities(m.special_abilities) for m in prototypes or monsters):
+        return None
+    
+    hooks = {'pre_round': [], 'on_hit': {}, 'post_round': [], 'by_kind': prototypes is not None}
+    if prototypes is None:
+        for monster in monsters:
+            for effect in compile_abilities(monster.special_abilities):
+                _add_hook(hooks, monster, Hook(monster, effect))
+    else:
+        for kind, prototype in enumerate(prototypes):
+            for effect in compile_abilities(prototype.special_abilities):
+                _add_hook(hooks, kind, KindHook(monsters, kind, effect))
+    return hooks
+
+
+def _add_hook(hooks, key, hook):
+    """File a hook under its effect's phase (on_hit hooks by monster or kind)"""
+    if hook.effect.phase == 'on_hit':
+        hooks['on_hit'].setdefault(key, []).append(hook)
+    else:
+        hooks[hook.effect.phase].append(hook)
+
+
+def reset_hooks(hooks):
+    """Reset per-fight state (e.g. breath weapon recharge) for a new fight"""
+    for phase in ('pre_round', 'post_round'):
+        for hook in hooks[phase]:
+            hook.reset()
+    for monster_hooks in hooks['on_hit'].values():
+        for hook in monster_hooks:
+            hook.reset()
+
+
+def run_phase(hooks, phase, target, round_number, log=None):
+    """
+    Run every hook of a pre_round or post_round phase.
+    
+    Args:
+        hooks: Dispatch table from build_hooks (or None)
+        phase: 'pre_round' or 'post_round'
+        target: The player character
+        round_number: Current round
+        log: List to append messages to (None builds no messages)
+    """
+    if hooks is None:
+        return
+    for hook in hooks[phase]:
+        hook.run(target, round_number, log)
+
+
+def run_on_hit(hooks, monster, target, round_number, log=None):
+    """Run the on_hit hooks of a monster (or MonsterTable row) that just hit the target"""
+    if hooks is None:
+        return
+    if hooks['by_kind']:
+        run_kind_on_hit(hooks, monster.kind, target, round_number, 1, log)
+        return
+    for hook in hooks['on_hit'].get(monster, ()):
+        hook.run(target, round_number, log)
+
+
+def run_kind_on_hit(hooks, kind, target, round_number, hits, log=None):
+    """
+    Run the on_hit hooks of one MonsterTable kind for all its hits at once.
+    
+    Args:
+        hooks: Dispatch table from build_hooks (or None)
+        kind: Prototype index of the monsters that hit
+        target: The player character
+        round_number: Current round
+        hits: Number of hits by monsters of this kind
+        log: List to append messages to (None builds no messages)
+    """
+    if hooks is None:
+        return
+    for hook in hooks['on_hit'].get(kind, ()):
+        hook.run(target, round_number, log, hits)
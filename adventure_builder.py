@@ -5,6 +5,8 @@ A text-based interface for creating JSON adventure files
 import json
 import os
 from adventure_loader import AdventureExporter, AdventureLoader
+from bestiary import default_bestiary
+from character import CLASSES, create_test_character
 from node import Adventure, GameNode
 
 
@@ -275,6 +277,7 @@ class AdventureBuilder:
         """Add monsters to a node"""
         print("\nAvailable monster types:")
         monsters = ['goblin', 'orc', 'skeleton', 'giant_spider', 'zombie', 'ogre', 'troll', 'dragon']
+        monsters += [name for name in default_bestiary().names() if name not in monsters]
         for i, monster in enumerate(monsters, 1):
             print(f"  {i}. {monster}")
         print(f"  {len(monsters) + 1}. Custom monster (create your own)")
@@ -297,6 +300,20 @@ class AdventureBuilder:
                 print(f"✓ Added {len([i for i in indices if 0 <= i <= len(monsters)])} monster(s)")
             except ValueError:
                 print("❌ Invalid input. Skipping monsters.")
+            if node.has_combat():
+                self.show_encounter_odds(node)
+                
+    def show_encounter_odds(self, node):
+        """Show level 1 win chances for each class against a node's monsters"""
+        odds = []
+        exact = True
+        for char_class in CLASSES:
+            character = create_test_character(char_class, 1)
+            result = node.encounter_odds(character, self.adventure)
+            odds.append(f"{char_class} {result['victory']:.0%}")
+            exact = exact and result['exact']
+        label = "" if exact else " (estimated)"
+        print(f"  Level 1 win chance{label}: {', '.join(odds)}")
     
     def create_custom_monster(self):
         """Create a custom monster with full stats"""
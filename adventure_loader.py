@@ -34,6 +34,10 @@ class AdventureLoader:
             
         Returns:
             Adventure instance
+            
+        Raises:
+            ValueError: If a custom monster has invalid dice or a node uses
+                        an unknown monster
         """
         # Create adventure
         adventure = Adventure(
@@ -52,6 +56,9 @@ class AdventureLoader:
             node = AdventureLoader._create_node(node_data)
             adventure.add_node(node)
         
+        # Validate and compile every monster once, before play starts
+        adventure.compile_monsters()
+        
         return adventure
     
     @staticmethod
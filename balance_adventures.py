@@ -0,0 +1,172 @@
+"""
+Encounter balancing tool
+Simulates every monster encounter in the adventure library against each
+character class at levels 1-5 and writes a per-node difficulty table
+"""
+import csv
+import glob
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import dice
+from adventure_loader import AdventureLoader
+from character import CLASSES, create_test_character
+
+LEVELS = [1, 2, 3, 4, 5]
+
+# Difficulty labels by minimum win rate
+DIFFICULTY = [
+    (0.99, 'trivial'),
+    (0.90, 'easy'),
+    (0.70, 'moderate'),
+    (0.40, 'hard'),
+    (0.0, 'deadly'),
+]
+
+FIELDS = ['adventure', 'node_id', 'monsters', 'class', 'level', 'trials',
+          'win_rate', 'difficulty', 'mean_rounds', 'mean_remaining_hp']
+
+# Adventures loaded by this worker process, keyed by file path
+_adventure_cache = {}
+
+
+def find_encounters(adventures_dir='adventures'):
+    """
+    Find every node with monsters in the adventure library.
+    
+    Args:
+        adventures_dir: Directory containing JSON adventures
+    
+    Returns:
+        List of (filepath, node_id, monsters) tuples
+    """
+    encounters = []
+    for filepath in sorted(glob.glob(os.path.join(adventures_dir, '*.json'))):
+        try:
+            adventure = AdventureLoader.load_from_file(filepath)
+        except Exception as e:
+            print(f"Skipping {filepath}: {e}")
+            continue
+        for node in adventure.nodes.values():
+            if node.has_combat():
+                encounters.append((filepath, node.node_id, list(node.monsters)))
+    return encounters
+
+
+def difficulty_label(win_rate):
+    """Get a difficulty label for a win rate"""
+    for minimum, label in DIFFICULTY:
+        if win_rate >= minimum:
+            return label
+    return DIFFICULTY[-1][1]
+
+
+def simulate_task(task):
+    """
+    Simulate one encounter for one class and level (runs in a worker).
+    
+    Args:
+        task: Tuple of (filepath, node_id, char_class, level, trials, seed)
+    
+    Returns:
+        Result row dictionary
+    """
+    filepath, node_id, char_class, level, trials, seed = task
+    
+    adventure = _adventure_cache.get(filepath)
+    if adventure is None:
+        adventure = AdventureLoader.load_from_file(filepath)
+        _adventure_cache[filepath] = adventure
+    
+    rng = dice.RNGStream(seed)
+    character = create_test_character(char_class, level, rng)
+    node = adventure.get_node(node_id)
+    combat = node.create_combat(character, adventure, rng)
+    
+    if dice.NUMPY_ENABLED:
+        result = combat.simulate_batch(trials, rng=rng)
+    else:
+        result = combat.simulate(trials, rng=rng)
+    
+    mean_rounds = sum(r * c for r, c in result['rounds'].items()) / trials
+    mean_hp = sum(hp * c for hp, c in result['remaining_hp'].items()) / trials
+    
+    return {
+        'adventure': adventure.title,
+        'node_id': node_id,
+        'monsters': ' '.join(node.monsters),
+        'class': char_class,
+        'level': level,
+        'trials': trials,
+        'win_rate': round(result['win_rate'], 4),
+        'difficulty': difficulty_label(result['win_rate']),
+        'mean_rounds': round(mean_rounds, 2),
+        'mean_remaining_hp': round(mean_hp, 2)
+    }
+
+
+def balance_library(adventures_dir='adventures', trials=None, workers=None, seed=None):
+    """
+    Simulate every encounter against every class at levels 1-5.
+    
+    Work is spread across a process pool, one task per
+    (node, class, level), so it scales with the number of cores.
+    
+    Args:
+        adventures_dir: Directory containing JSON adventures
+        trials: Fights per task (default: 20000 with NumPy, 1000 without)
+        workers: Number of worker processes (default: all cores)
+        seed: Base seed for reproducible results
+    
+    Returns:
+        List of result row dictionaries
+    """
+    if trials is None:
+        trials = 20000 if dice.NUMPY_ENABLED else 1000
+    
+    encounters = find_encounters(adventures_dir)
+    streams = dice.RNGStream(seed).split(len(encounters) * len(CLASSES) * len(LEVELS))
+    
+    tasks = []
+    for filepath, node_id, _ in encounters:
+        for char_class in CLASSES:
+            for level in LEVELS:
+                tasks.append((filepath, node_id, char_class, level, trials, streams[len(tasks)].seed))
+    
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(simulate_task, tasks, chunksize=4))
+
+
+def write_results(rows, filepath):
+    """Write result rows as CSV or JSON depending on the file extension"""
+    if filepath.lower().endswith('.json'):
+        with open(filepath, 'w', encoding='utf-8') as f:
+            json.dump(rows, f, indent=2, ensure_ascii=False)
+    else:
+        with open(filepath, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=FIELDS)
+            writer.writeheader()
+            writer.writerows(rows)
+
+
+def main():
+    """Main function"""
+    if len(sys.argv) > 1 and sys.argv[1] in ('-h', '--help'):
+        print("Usage: python balance_adventures.py [output.csv|output.json] [trials]")
+        print("\nExample:")
+        print("  python balance_adventures.py balance.csv 50000")
+        return
+    
+    output = sys.argv[1] if len(sys.argv) > 1 else 'balance.csv'
+    trials = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    
+    print(f"Simulating encounters on {os.cpu_count()} cores...")
+    rows = balance_library(trials=trials)
+    write_results(rows, output)
+    print(f"✓ Wrote {len(rows)} rows to {output}")
+
+
+if __name__ == "__main__":
+    main()
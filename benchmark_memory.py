@@ -0,0 +1,88 @@
+"""
+Memory benchmark for the core game objects
+Reports bytes per instance with __slots__ against the same attributes
+stored in a per-instance __dict__ (the layout used before slots)
+"""
+import sys
+import tracemalloc
+
+from character import Character
+from monster import Goblin
+from node import Adventure, GameNode
+from spell import Fireball
+
+
+def sample_objects():
+    """One representative instance of each slotted class"""
+    node = GameNode("hall", "Great Hall", "A vaulted hall lit by torches.")
+    node.add_monster_encounter(["goblin", "goblin"])
+    node.add_choice("Go north", "tower")
+    return [
+        Character("Hero", "Wizard"),
+        Goblin(),
+        node,
+        Adventure("Dark Tower", "A climb to the top.", "hall"),
+        Fireball(),
+    ]
+
+
+def slot_names(obj):
+    """All slot names of an object's class, base classes first"""
+    names = []
+    for cls in reversed(type(obj).__mro__):
+        names.extend(cls.__dict__.get('__slots__', ()))
+    return names
+
+
+def bytes_per_instance(factory, count):
+    """Average traced allocation of count objects made by factory"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = [factory() for _ in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return (after - before - sys.getsizeof(objects)) / count
+
+
+def compare(obj, count):
+    """
+    Measure copies of obj with and without slots.
+    
+    Both layouts hold references to the same attribute values, so only the
+    per-instance overhead differs.
+    
+    Returns:
+        Tuple of (dict bytes per instance, slotted bytes per instance)
+    """
+    cls = type(obj)
+    values = [(name, getattr(obj, name)) for name in slot_names(obj)]
+    unslotted = type(f"Dict{cls.__name__}", (), {})
+    
+    def make_slotted():
+        copy = cls.__new__(cls)
+        for name, value in values:
+            setattr(copy, name, value)
+        return copy
+    
+    def make_unslotted():
+        copy = unslotted()
+        for name, value in values:
+            setattr(copy, name, value)
+        return copy
+    
+    return bytes_per_instance(make_unslotted, count), bytes_per_instance(make_slotted, count)
+
+
+def main():
+    """Main function"""
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    
+    print(f"Bytes per instance ({count} instances each)\n")
+    print(f"{'Class':<12} {'__dict__':>10} {'__slots__':>10} {'Saved':>8}")
+    for obj in sample_objects():
+        before, after = compare(obj, count)
+        print(f"{type(obj).__name__:<12} {before:>10.0f} {after:>10.0f} {1 - after / before:>8.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+Shared bestiary: an indexed, lazily loaded monster database
+
+The bestiary is a JSON Lines file with one stat block per line, starting
+with its lookup key:
+    
+    {"key": "goblin", "name": "Goblin", "hit_dice": "2d6", ...}
+
+Opening a bestiary only scans the keys to build a name -> byte offset
+index. A stat block is parsed and compiled the first time it is used and
+kept in a small LRU cache.
+"""
+import json
+import os
+import re
+from collections import OrderedDict
+
+from monster import MONSTER_TYPES, Monster, MonsterTemplate
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bestiary.jsonl')
+
+# The key is written first on every line, so the index never parses JSON
+_KEY_RE = re.compile(rb'\{\s*"key"\s*:\s*("(?:[^"\\]|\\.)*")')
+
+
+class Bestiary:
+    """Monster stat blocks loaded on first use from an indexed file"""
+    
+    def __init__(self, path=DEFAULT_PATH, cache_size=128):
+        """
+        Open a bestiary and index its entries.
+        
+        Args:
+            path: JSON Lines file (a missing file gives an empty bestiary)
+            cache_size: Maximum number of compiled entries kept in memory
+        """
+        self.path = path
+        self.cache_size = cache_size
+        self._index = {}  # lowercase key -> byte offset of the entry's line
+        self._cache = OrderedDict()  # lowercase key -> MonsterTemplate
+        self.loads = 0  # Entries parsed from the file so far
+        self._build_index()
+    
+    def _build_index(self):
+        """Record the byte offset of every entry"""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'rb') as f:
+            offset = 0
+            for line in f:
+                match = _KEY_RE.match(line)
+                if match:
+                    key = json.loads(match.group(1))
+                elif line.strip():
+                    key = json.loads(line)['key']
+                else:
+                    key = None
+                if key is not None:
+                    self._index[key.lower()] = offset
+                offset += len(line)
+    
+    def __contains__(self, name):
+        return name.lower() in self._index
+    
+    def __len__(self):
+        return len(self._index)
+    
+    def names(self):
+        """Lookup keys of every entry, in file order"""
+        return list(self._index)
+    
+    def get_stats(self, name):
+        """
+        Read one entry's raw stat block from the file.
+        
+        Args:
+            name: Monster key (case-insensitive)
+        
+        Returns:
+            Dictionary of stats, or None if the name is not in the bestiary
+        """
+        offset = self._index.get(name.lower())
+        if offset is None:
+            return None
+        with open(self.path, 'rb') as f:
+            f.seek(offset)
+            line = f.readline()
+        self.loads += 1
+        return json.loads(line)
+    
+    def get_template(self, name):
+        """
+        Get the compiled template for a monster, loading it on first use.
+        
+        An entry whose key matches a predefined monster class (e.g. 'dragon')
+        overrides its stats but still spawns that class, so its special
+        methods work. The shipped bestiary has no such entries.
+        
+        Args:
+            name: Monster key (case-insensitive)
+        
+        Returns:
+            MonsterTemplate, or None if the name is not in the bestiary
+        
+        Raises:
+            ValueError: If the entry's hit_dice or damage is not valid dice notation
+        """
+        key = name.lower()
+        template = self._cache.get(key)
+        if template is not None:
+            self._cache.move_to_end(key)
+            return template
+        
+        stats = self.get_stats(key)
+        if stats is None:
+            return None
+        try:
+            template = MonsterTemplate.from_stats(stats.get('name', stats['key']), stats,
+                                                  MONSTER_TYPES.get(key, Monster))
+        except ValueError as e:
+            raise ValueError(f"Bestiary entry '{stats['key']}': {e}") from None
+        
+        self._cache[key] = template
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return template
+    
+    def add(self, name, stats):
+        """
+        Append a stat block to the bestiary file.
+        
+        Args:
+            name: Lookup key for the monster
+            stats: Stat dictionary (same fields as custom_monsters entries)
+        
+        Raises:
+            ValueError: If the key already exists, names a predefined
+                monster class, or the dice are invalid
+        """
+        if name in self:
+            raise ValueError(f"Bestiary already has an entry for '{name}'")
+        if name.lower() in MONSTER_TYPES:
+            raise ValueError(f"'{name}' is a predefined monster; edit its class in monster.py")
+        MonsterTemplate.from_stats(stats.get('name', name), stats)
+        
+        line = (json.dumps({'key': name, **stats}, ensure_ascii=False) + '\n').encode('utf-8')
+        with open(self.path, 'ab') as f:
+            offset = f.tell()
+            f.write(line)
+        self._index[name.lower()] = offset
+
+
+# Bestiary used by create_monster and adventures (opened on first use)
+_default_bestiary = None
+
+
+def default_bestiary():
+    """Get the shared bestiary next to this module"""
+    global _default_bestiary
+    if _default_bestiary is None:
+        _default_bestiary = Bestiary()
+    return _default_bestiary
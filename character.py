@@ -2,6 +2,65 @@
 Character system following OGL D20 rules
 """
 import dice
+import progression
+from dice import np
+from effects import EffectTimeline
+from inventory import Inventory
+
+# Ability score -> attribute holding its cached modifier
+ABILITY_MODIFIERS = {
+    'strength': 'str_mod', 'dexterity': 'dex_mod', 'constitution': 'con_mod',
+    'intelligence': 'int_mod', 'wisdom': 'wis_mod', 'charisma': 'cha_mod',
+}
+
+# Stats set from the class progression; temporary modifiers (Shield, Bless)
+# are added on top, so recomputing applies only the change in base value
+DERIVED_STATS = ('max_hp', 'base_attack_bonus', 'fortitude_save', 'reflex_save',
+                 'will_save', 'armor_class')
+
+
+# Playable classes and their standard ability scores (STR, DEX, CON, INT,
+# WIS, CHA), the same as character creation in main.py
+CLASSES = ['Fighter', 'Wizard', 'Rogue', 'Cleric']
+STANDARD_SCORES = {
+    'Fighter': [15, 14, 13, 8, 10, 12],
+    'Wizard': [8, 12, 13, 15, 14, 10],
+    'Rogue': [12, 15, 13, 14, 10, 8],
+    'Cleric': [14, 8, 13, 10, 15, 12],
+}
+
+# Simple level up at 1000 XP per level: level n needs (n - 1) * 1000 XP
+XP_PER_LEVEL = 1000
+
+
+def level_for_experience(experience):
+    """Level reached with the given experience points"""
+    return max(1, experience // XP_PER_LEVEL + 1)
+
+
+def _ability_score(name):
+    """
+    Property for an ability score that caches its modifier.
+    
+    The modifier is recomputed only when the score is set; a changed
+    Constitution or Dexterity modifier updates HP or AC straight away.
+    """
+    private = '_' + name
+    modifier_attr = ABILITY_MODIFIERS[name]
+    affects_derived = name in ('constitution', 'dexterity')
+    
+    def get(self):
+        return getattr(self, private)
+    
+    def set(self, score):
+        setattr(self, private, score)
+        modifier = dice.modifier(score)
+        if modifier != getattr(self, modifier_attr, None):
+            setattr(self, modifier_attr, modifier)
+            if affects_derived and self._base_stats is not None:
+                self._update_derived_stats()
+    
+    return property(get, set, doc=f"{name.capitalize()} score")
 
 
 class Character:
@@ -9,11 +68,34 @@ class Character:
     Player character with D20 attributes and stats
     """
     
-    def __init__(self, name, char_class="Fighter", level=1):
+    __slots__ = (
+        'name', 'char_class', 'level', 'rng',
+        '_strength', '_dexterity', '_constitution', '_intelligence', '_wisdom', '_charisma',
+        'str_mod', 'dex_mod', 'con_mod', 'int_mod', 'wis_mod', 'cha_mod',
+        'max_hp', 'current_hp', 'base_attack_bonus', 'armor_class',
+        'fortitude_save', 'reflex_save', 'will_save', '_base_stats',
+        'inventory', 'equipped_weapon', 'equipped_armor',
+        'known_spells', 'spell_slots', 'max_spell_slots', 'experience', 'gold', 'effects',
+    )
+    
+    strength = _ability_score('strength')
+    dexterity = _ability_score('dexterity')
+    constitution = _ability_score('constitution')
+    intelligence = _ability_score('intelligence')
+    wisdom = _ability_score('wisdom')
+    charisma = _ability_score('charisma')
+    
+    def __init__(self, name, char_class="Fighter", level=1, rng=None):
+        # Base values of DERIVED_STATS last applied (None until first computed)
+        self._base_stats = None
+        
         self.name = name
         self.char_class = char_class
         self.level = level
         
+        # Random stream for this character's rolls (None = global generator)
+        self.rng = rng
+        
         # Core ability scores (3-18 range typically)
         self.strength = 10
         self.dexterity = 10
@@ -34,26 +116,62 @@ class Character:
         self.will_save = 0
         
         # Inventory and equipment
-        self.inventory = []
+        self.inventory = Inventory()
         self.equipped_weapon = None
         self.equipped_armor = None
         
         # Spells (for spellcasting classes)
         self.known_spells = []
         self.spell_slots = {}  # {level: available_slots}
+        self.max_spell_slots = {}  # {level: slots per day}
         
         # Experience and wealth
         self.experience = 0
         self.gold = 0
         
+        # Timed buffs and debuffs (Shield, Bless, poison), ticked by Combat
+        self.effects = EffectTimeline()
+        
+    def fork(self):
+        """
+        Copy the character for what-if search.
+        
+        Only the mutable core is copied: inventory stacks, spell slots,
+        the known spells list and active effects. Spell and item objects,
+        equipment and the random stream are shared with this character.
+        
+        Returns:
+            Independent Character with the same state
+        """
+        fork = Character.__new__(Character)
+        self._copy_state(fork)
+        return fork
+        
+    def restore(self, snapshot):
+        """
+        Return to the state of a snapshot taken with fork().
+        
+        The snapshot itself is left unchanged and can be restored again.
+        """
+        snapshot._copy_state(self)
+        
+    def _copy_state(self, other):
+        """Copy this character's state onto other (see fork)"""
+        for name in Character.__slots__:
+            setattr(other, name, getattr(self, name))
+        other.inventory = self.inventory.copy()
+        other.known_spells = list(self.known_spells)
+        other.spell_slots = dict(self.spell_slots)
+        other.effects = self.effects.copy({id(self): other})
+        
     def roll_abilities(self):
         """Roll ability scores using 4d6 drop lowest method"""
-        self.strength = dice.ability_score()
-        self.dexterity = dice.ability_score()
-        self.constitution = dice.ability_score()
-        self.intelligence = dice.ability_score()
-        self.wisdom = dice.ability_score()
-        self.charisma = dice.ability_score()
+        self.strength = dice.ability_score(self.rng)
+        self.dexterity = dice.ability_score(self.rng)
+        self.constitution = dice.ability_score(self.rng)
+        self.intelligence = dice.ability_score(self.rng)
+        self.wisdom = dice.ability_score(self.rng)
+        self.charisma = dice.ability_score(self.rng)
         self._update_derived_stats()
         
     def set_abilities(self, str_score, dex, con, int_score, wis, cha):
@@ -67,73 +185,49 @@ class Character:
         self._update_derived_stats()
         
     def _update_derived_stats(self):
-        """Update HP, AC, and other derived stats based on abilities"""
-        con_mod = self.get_ability_modifier('constitution')
-        
-        # Update HP based on class and constitution
-        if self.char_class == "Fighter":
-            self.max_hp = 10 + con_mod + (self.level - 1) * (6 + con_mod)
-            self.base_attack_bonus = self.level
-            self.fortitude_save = 2 + (self.level // 2)
-            self.reflex_save = 0 + (self.level // 3)
-            self.will_save = 0 + (self.level // 3)
-        elif self.char_class == "Wizard":
-            self.max_hp = 4 + con_mod + (self.level - 1) * (3 + con_mod)
-            self.base_attack_bonus = self.level // 2
-            self.fortitude_save = 0 + (self.level // 3)
-            self.reflex_save = 0 + (self.level // 3)
-            self.will_save = 2 + (self.level // 2)
-            self._setup_wizard_spells()
-        elif self.char_class == "Rogue":
-            self.max_hp = 6 + con_mod + (self.level - 1) * (4 + con_mod)
-            self.base_attack_bonus = (self.level * 3) // 4
-            self.fortitude_save = 0 + (self.level // 3)
-            self.reflex_save = 2 + (self.level // 2)
-            self.will_save = 0 + (self.level // 3)
-        elif self.char_class == "Cleric":
-            self.max_hp = 8 + con_mod + (self.level - 1) * (5 + con_mod)
-            self.base_attack_bonus = (self.level * 3) // 4
-            self.fortitude_save = 2 + (self.level // 2)
-            self.reflex_save = 0 + (self.level // 3)
-            self.will_save = 2 + (self.level // 2)
-            self._setup_cleric_spells()
-        
-        # Ensure HP is at least 1 per level
-        self.max_hp = max(self.max_hp, self.level)
-        self.current_hp = self.max_hp
-        
-        # Base AC is 10 + Dex modifier
-        dex_mod = self.get_ability_modifier('dexterity')
-        self.armor_class = 10 + dex_mod
-        
-    def _setup_wizard_spells(self):
-        """Setup spell slots for wizard"""
-        # Simplified spell slots per level
-        slots_per_level = {
-            1: {0: 3, 1: 1},
-            2: {0: 3, 1: 2},
-            3: {0: 3, 1: 2, 2: 1},
-            4: {0: 4, 1: 3, 2: 2},
-            5: {0: 4, 1: 3, 2: 2, 3: 1}
-        }
-        self.spell_slots = slots_per_level.get(self.level, {0: 3, 1: 1})
-        
-    def _setup_cleric_spells(self):
-        """Setup spell slots for cleric"""
-        # Simplified spell slots per level
-        slots_per_level = {
-            1: {0: 3, 1: 1},
-            2: {0: 4, 1: 2},
-            3: {0: 4, 1: 2, 2: 1},
-            4: {0: 5, 1: 3, 2: 2},
-            5: {0: 5, 1: 3, 2: 2, 3: 1}
-        }
-        self.spell_slots = slots_per_level.get(self.level, {0: 3, 1: 1})
+        """
+        Recompute HP, attack bonus, saves, AC and spell slots.
         
+        Base values come from the class progression table and the cached
+        modifiers. Only the change from the previous base values is
+        applied, so current HP, spent spell slots and temporary effects
+        are kept: gaining 8 max HP also heals 8, and a new spell slot is
+        available at once.
+        """
+        stats = progression.level_stats(self.char_class, self.level)
+        if stats is None:
+            # No progression for this class: keep its stats, update AC only
+            base = self._base_stats or (self.max_hp, self.base_attack_bonus, self.fortitude_save,
+                                        self.reflex_save, self.will_save, self.armor_class)
+            new_base = base[:5] + (10 + self.dex_mod,)
+            slots = self.max_spell_slots
+        else:
+            # HP is at least 1 per level
+            max_hp = max(stats.hit_points + self.level * self.con_mod, self.level)
+            new_base = (max_hp, stats.base_attack_bonus, stats.fortitude_save,
+                        stats.reflex_save, stats.will_save, 10 + self.dex_mod)
+            slots = stats.spell_slots
+            
+        old_base = self._base_stats
+        if old_base is None:
+            old_base = tuple(getattr(self, stat) for stat in DERIVED_STATS)
+        for stat, old, new in zip(DERIVED_STATS, old_base, new_base):
+            if new != old:
+                setattr(self, stat, getattr(self, stat) + new - old)
+        self.current_hp = min(self.current_hp + new_base[0] - old_base[0], self.max_hp)
+        self._base_stats = new_base
+        
+        if slots != self.max_spell_slots:
+            old_slots = self.max_spell_slots
+            self.spell_slots = {
+                level: max(0, self.spell_slots.get(level, 0) + count - old_slots.get(level, 0))
+                for level, count in slots.items()
+            }
+            self.max_spell_slots = dict(slots)
+            
     def get_ability_modifier(self, ability):
         """Get the modifier for an ability score"""
-        score = getattr(self, ability.lower())
-        return dice.modifier(score)
+        return getattr(self, ABILITY_MODIFIERS[ability.lower()])
         
     def attack_roll(self, target_ac, weapon_damage="1d8"):
         """
@@ -147,8 +241,8 @@ class Character:
             Tuple of (hit: bool, damage: int)
         """
         # Attack roll: d20 + BAB + STR modifier (for melee)
-        str_mod = self.get_ability_modifier('strength')
-        attack_roll = dice.d20(1, self.base_attack_bonus + str_mod)
+        str_mod = self.str_mod
+        attack_roll = dice.d20(1, self.base_attack_bonus + str_mod, self.rng)
         
         if attack_roll >= target_ac:
             # Hit! Roll damage
@@ -158,23 +252,8 @@ class Character:
             return False, 0
             
     def _roll_damage(self, damage_dice):
-        """Parse and roll damage dice string (e.g., '2d6', '1d8+2')"""
-        if '+' in damage_dice:
-            dice_part, mod = damage_dice.split('+')
-            mod = int(mod)
-        elif '-' in damage_dice:
-            dice_part, mod = damage_dice.split('-')
-            mod = -int(mod)
-        else:
-            dice_part = damage_dice
-            mod = 0
-            
-        # Parse dice notation
-        count, sides = dice_part.split('d')
-        count = int(count)
-        sides = int(sides)
-        
-        return dice.roll(sides, count, mod)
+        """Roll damage dice string (e.g., '2d6', '1d8+2')"""
+        return dice.parse(damage_dice).roll(self.rng)
         
     def take_damage(self, damage):
         """Take damage and return True if still alive"""
@@ -200,13 +279,13 @@ class Character:
             Roll result
         """
         if save_type == 'fortitude':
-            return dice.d20(1, self.fortitude_save)
+            return dice.d20(1, self.fortitude_save, self.rng)
         elif save_type == 'reflex':
-            return dice.d20(1, self.reflex_save)
+            return dice.d20(1, self.reflex_save, self.rng)
         elif save_type == 'will':
-            return dice.d20(1, self.will_save)
+            return dice.d20(1, self.will_save, self.rng)
         else:
-            return dice.d20()
+            return dice.d20(rng=self.rng)
             
     def add_item(self, item):
         """Add item to inventory"""
@@ -226,50 +305,21 @@ class Character:
     
     def count_item(self, item_name):
         """Count how many items with the given name are in inventory."""
-        count = 0
-        for item in self.inventory:
-            # Handle both string items and item objects
-            if hasattr(item, 'name'):
-                if item.name.lower() == item_name.lower():
-                    count += 1
-            elif isinstance(item, str):
-                if item.lower() == item_name.lower():
-                    count += 1
-        return count
+        return self.inventory.count(item_name)
     
     def remove_items(self, item_name, quantity):
         """Remove a specific quantity of items. Returns True if successful, False if not enough."""
-        if self.count_item(item_name) >= quantity:
-            removed = 0
-            # Create a new list without the removed items
-            new_inventory = []
-            for item in self.inventory:
-                # Check if this is the item to remove
-                is_target = False
-                if hasattr(item, 'name'):
-                    is_target = item.name.lower() == item_name.lower()
-                elif isinstance(item, str):
-                    is_target = item.lower() == item_name.lower()
-                
-                # Remove if we haven't removed enough yet
-                if is_target and removed < quantity:
-                    removed += 1
-                else:
-                    new_inventory.append(item)
-            
-            self.inventory = new_inventory
-            return True
-        return False
+        return self.inventory.remove(item_name, quantity)
         
     def use_item(self, item_name):
         """Use an item from inventory"""
-        for item in self.inventory:
-            if item.name.lower() == item_name.lower():
-                effect = item.use(self)
-                if item.consumable:
-                    self.inventory.remove(item)
-                return effect
-        return None
+        item = self.inventory.get(item_name)
+        if item is None or not hasattr(item, 'use'):
+            return None
+        effect = item.use(self)
+        if item.consumable:
+            self.inventory.remove(item_name)
+        return effect
         
     def learn_spell(self, spell):
         """Learn a new spell"""
@@ -297,16 +347,28 @@ class Character:
         
     def rest(self):
         """Rest to restore HP and spell slots"""
+        self.effects.clear()
         self.current_hp = self.max_hp
-        self._update_derived_stats()  # Restore spell slots
+        self.spell_slots = dict(self.max_spell_slots)
         
     def gain_experience(self, xp):
-        """Gain experience points"""
+        """
+        Gain experience points, jumping straight to the level they reach.
+        
+        Derived stats are recomputed once however many levels are gained.
+        
+        Returns:
+            Number of levels gained
+        """
         self.experience += xp
-        # Simple level up at 1000 XP per level
-        while self.experience >= self.level * 1000:
-            self.level_up()
-            
+        level = level_for_experience(self.experience)
+        if level <= self.level:
+            return 0
+        gained = level - self.level
+        self.level = level
+        self._update_derived_stats()
+        return gained
+        
     def level_up(self):
         """Level up the character"""
         self.level += 1
@@ -385,3 +447,57 @@ class Character:
     def __str__(self):
         """Default string representation - returns compact version"""
         return self.get_character_sheet(detailed=False)
+
+
+def create_test_character(char_class, level, rng=None):
+    """Create a character with standard class scores at the given level"""
+    character = Character(f"Test {char_class}", char_class, level=level, rng=rng)
+    character.set_abilities(*STANDARD_SCORES[char_class])
+    return character
+
+
+def generate_characters(n, char_class="Fighter", level=1, rng=None):
+    """
+    Roll n characters at once and return their stats as columns (requires NumPy).
+    
+    All n x 6 ability scores are rolled 4d6-drop-lowest in one vectorized
+    draw; derived stats follow the same rules as Character without
+    creating any Character objects. Useful for population studies, e.g.
+    the fraction of characters meeting a requirement:
+    
+        batch = generate_characters(100000, "Rogue")
+        (batch['dexterity'] >= 12).mean()
+    
+    Args:
+        n: Number of characters
+        char_class: Class with a progression table (Fighter, Wizard, Rogue, Cleric)
+        level: Character level
+        rng: RNGStream to draw from (default: module-level NumPy generator)
+        
+    Returns:
+        Dictionary of NumPy arrays of length n: the six ability scores,
+        their modifiers (str_mod, ...), max_hp, base_attack_bonus,
+        fortitude_save, reflex_save, will_save and armor_class
+        
+    Raises:
+        ValueError: If char_class has no progression table
+    """
+    dice._require_numpy()
+    stats = progression.level_stats(char_class, level)
+    if stats is None:
+        raise ValueError(f"Unknown class '{char_class}' "
+                         f"(expected one of: {', '.join(progression.CLASS_RULES)})")
+    
+    scores = dice.roll_expr_many("4d6kh3", n * 6, rng).reshape(n, 6)
+    batch = {}
+    for column, (ability, modifier_attr) in enumerate(ABILITY_MODIFIERS.items()):
+        batch[ability] = scores[:, column]
+        batch[modifier_attr] = (scores[:, column] - 10) // 2
+    
+    batch['max_hp'] = np.maximum(stats.hit_points + level * batch['con_mod'], level)
+    batch['base_attack_bonus'] = np.full(n, stats.base_attack_bonus)
+    batch['fortitude_save'] = np.full(n, stats.fortitude_save)
+    batch['reflex_save'] = np.full(n, stats.reflex_save)
+    batch['will_save'] = np.full(n, stats.will_save)
+    batch['armor_class'] = 10 + batch['dex_mod']
+    return batch
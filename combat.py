@@ -1,7 +1,82 @@
 """
 Combat system with D20 mechanics
 """
+import copy
+from collections import Counter
+import abilities
 import dice
+from effects import EffectTimeline
+from mass_battle import MonsterTable
+from monster import Swarm
+
+# Default action used by execute_round() and simulate()
+DEFAULT_ACTION = {'type': 'attack', 'weapon_damage': '1d8'}
+
+# Character attributes restored between simulated fights (poison lowers them)
+ABILITY_SCORES = ('strength', 'dexterity', 'constitution', 'intelligence', 'wisdom', 'charisma')
+
+
+class TurnScheduler:
+    """
+    Initiative order for one combat, kept between rounds.
+    
+    Combatants are stored as object handles (never matched by name), sorted
+    once by initiative. Dead combatants are dropped lazily: they are
+    skipped when reached and the order is compacted once more than half
+    of it is dead, so a death costs amortized O(1).
+    """
+    
+    def __init__(self, character, monsters, rng=None):
+        """
+        Roll initiative for the character and every living monster.
+        
+        Args:
+            character: Player character
+            monsters: List of monsters
+            rng: RNGStream for the initiative rolls
+        """
+        self.character = character
+        self._dead = set()
+        
+        dex_mod = character.dex_mod
+        entries = [(dice.d20(1, dex_mod, rng), 0, character)]
+        for index, monster in enumerate(monsters, 1):
+            if monster.is_alive():
+                entries.append((dice.d20(rng=rng), index, monster))
+                
+        # Highest initiative first; ties keep the player, then list order
+        entries.sort(key=lambda entry: (-entry[0], entry[1]))
+        self._order = [(combatant, init) for init, _, combatant in entries]
+        
+    def remove(self, combatant):
+        """Drop a combatant (e.g. a slain monster) from the order"""
+        self._dead.add(combatant)
+        
+    def order(self):
+        """
+        Get the current order.
+        
+        Returns:
+            List of (combatant, initiative) tuples, highest first
+        """
+        return [(c, init) for c, init in self._order if c not in self._dead]
+        
+    def __iter__(self):
+        """Yield combatants in initiative order, skipping the dead"""
+        if len(self._dead) * 2 > len(self._order):
+            self._order = self.order()
+            self._dead.clear()
+            
+        for combatant, _ in self._order:
+            if combatant in self._dead:
+                continue
+            if combatant is not self.character and not combatant.is_alive():
+                self._dead.add(combatant)
+                continue
+            yield combatant
+            
+    def __len__(self):
+        return len(self._order) - len(self._dead)
 
 
 class Combat:
@@ -9,47 +84,44 @@ class Combat:
     Handles turn-based combat between character and monsters
     """
     
-    def __init__(self, character, monsters):
+    def __init__(self, character, monsters, rng=None, reroll_initiative=False):
         """
         Initialize combat.
         
         Args:
             character: Player character
             monsters: List of monsters or single monster
+            rng: RNGStream for initiative and flee rolls (default: the character's)
+            reroll_initiative: Re-roll initiative every round instead of
+                               once at the start of combat
         """
         self.character = character
+        self.rng = rng if rng is not None else character.rng
+        self.reroll_initiative = reroll_initiative
+        self.scheduler = None
         
-        # Ensure monsters is a list
-        if not isinstance(monsters, list):
-            self.monsters = [monsters]
-        else:
+        # Ensure monsters is a list (or a MonsterTable for mass battles)
+        if isinstance(monsters, (list, MonsterTable)):
             self.monsters = monsters
+        else:
+            self.monsters = [monsters]
+        self.horde = monsters if isinstance(monsters, MonsterTable) else None
+        self.hooks = abilities.build_hooks(self.monsters)  # None without special abilities
+        self._player_initiative = None  # Used instead of the scheduler for hordes
             
         self.round = 0
         self.combat_log = []
         
     def roll_initiative(self):
         """
-        Roll initiative for all combatants.
+        Roll initiative for all combatants and reset the turn scheduler.
         
         Returns:
             Ordered list of (name, initiative, is_player) tuples
         """
-        initiatives = []
-        
-        # Player initiative
-        dex_mod = self.character.get_ability_modifier('dexterity')
-        player_init = dice.d20(1, dex_mod)
-        initiatives.append((self.character.name, player_init, True))
-        
-        # Monster initiatives
-        for monster in self.monsters:
-            monster_init = dice.d20()
-            initiatives.append((monster.name, monster_init, False))
-            
-        # Sort by initiative (highest first)
-        initiatives.sort(key=lambda x: x[1], reverse=True)
-        return initiatives
+        self.scheduler = TurnScheduler(self.character, self.monsters, self.rng)
+        return [(combatant.name, init, combatant is self.character)
+                for combatant, init in self.scheduler.order()]
         
     def execute_round(self, player_action=None, target_index=0):
         """
@@ -64,104 +136,76 @@ class Combat:
             target_index: Index of target monster (default 0)
             
         Returns:
-            Dictionary with combat results
+            Dictionary with combat results. 'log' holds only this round's
+            messages; use events_since() or iter_log() for the history.
         """
         self.round += 1
         round_log = [f"\n--- Round {self.round} ---"]
         
         # Default action is attack
         if player_action is None:
-            player_action = {'type': 'attack', 'weapon_damage': '1d8'}
+            player_action = DEFAULT_ACTION
             
         # Check if combat should end
         if not self.character.is_alive():
+            self.character.effects.clear()
             return {
                 'status': 'defeat',
                 'message': 'You have been defeated!',
-                'log': self.combat_log
+                'log': []
             }
             
-        alive_monsters = [m for m in self.monsters if m.is_alive()]
+        alive_monsters = self._alive_monsters()
         if not alive_monsters:
+            self.character.effects.clear()
             return {
                 'status': 'victory',
                 'message': 'All enemies defeated!',
-                'log': self.combat_log,
+                'log': [],
                 'rewards': self._collect_rewards()
             }
-            
-        # Get initiative order
-        init_order = self.roll_initiative()
+        target = alive_monsters[target_index] if target_index < len(alive_monsters) else None
+        
+        # Start-of-round special abilities
+        abilities.run_phase(self.hooks, 'pre_round', self.character, self.round, round_log)
         
         # Execute actions in initiative order
-        for name, init, is_player in init_order:
-            if is_player:
-                # Player's turn
-                if player_action['type'] == 'attack':
-                    if target_index < len(alive_monsters):
-                        target = alive_monsters[target_index]
-                        weapon_dmg = player_action.get('weapon_damage', '1d8')
-                        hit, damage = self.character.attack_roll(target.armor_class, weapon_dmg)
-                        
-                        if hit:
-                            target.take_damage(damage)
-                            msg = f"{self.character.name} hits {target.name} for {damage} damage!"
-                            if not target.is_alive():
-                                msg += f" {target.name} is defeated!"
-                        else:
-                            msg = f"{self.character.name} misses {target.name}!"
-                        round_log.append(msg)
-                        
-                elif player_action['type'] == 'spell':
-                    spell = player_action['spell']
-                    target = alive_monsters[target_index] if target_index < len(alive_monsters) else None
-                    success, result = self.character.cast_spell(spell, target)
-                    round_log.append(result)
-                    
-                elif player_action['type'] == 'item':
-                    item_name = player_action['item_name']
-                    result = self.character.use_item(item_name)
-                    if result:
-                        round_log.append(result)
-                    else:
-                        round_log.append(f"Cannot use {item_name}!")
-                        
-                elif player_action['type'] == 'flee':
-                    # Attempt to flee (DEX check)
-                    flee_roll = dice.d20(1, self.character.get_ability_modifier('dexterity'))
-                    if flee_roll >= 10:
-                        return {
-                            'status': 'fled',
-                            'message': 'You successfully fled from combat!',
-                            'log': self.combat_log + round_log
-                        }
-                    else:
-                        round_log.append(f"{self.character.name} fails to flee!")
-            else:
-                # Monster's turn
-                for monster in self.monsters:
-                    if monster.name == name and monster.is_alive():
-                        hit, damage, msg = monster.attack(self.character)
-                        round_log.append(msg)
-                        break
-                        
+        if self.horde is not None:
+            fled = self._execute_mass_turns(player_action, target, round_log)
+        else:
+            fled = self._execute_turns(player_action, target, round_log)
+            
+        if fled:
+            self.character.effects.clear()
+            self.combat_log.extend(round_log)
+            return {
+                'status': 'fled',
+                'message': 'You successfully fled from combat!',
+                'log': round_log
+            }
+            
+        # End-of-round special abilities
+        abilities.run_phase(self.hooks, 'post_round', self.character, self.round, round_log)
+        
         # Update combat log
         self.combat_log.extend(round_log)
         
         # Check end conditions again
         if not self.character.is_alive():
+            self.character.effects.clear()
             return {
                 'status': 'defeat',
                 'message': 'You have been defeated!',
-                'log': self.combat_log
+                'log': round_log
             }
             
-        alive_monsters = [m for m in self.monsters if m.is_alive()]
+        alive_monsters = self._alive_monsters()
         if not alive_monsters:
+            self.character.effects.clear()
             return {
                 'status': 'victory',
                 'message': 'All enemies defeated!',
-                'log': self.combat_log,
+                'log': round_log,
                 'rewards': self._collect_rewards()
             }
             
@@ -169,11 +213,163 @@ class Combat:
         return {
             'status': 'ongoing',
             'message': f'Round {self.round} complete.',
-            'log': self.combat_log,
+            'log': round_log,
             'alive_monsters': alive_monsters,
             'character_hp': f"{self.character.current_hp}/{self.character.max_hp}"
         }
         
+    def _expire_effects(self, round_log):
+        """Advance the character's effect timeline by one round (at the start of their turn)"""
+        ended = []
+        for effect in self.character.effects.tick():
+            if (effect.name, effect.target) not in ended:
+                ended.append((effect.name, effect.target))
+        for name, target in ended:
+            round_log.append(f"{name} wears off {target.name}.")
+            
+    def _alive_monsters(self):
+        """List of living monsters"""
+        if self.horde is not None:
+            return self.horde.alive_members()
+        return [m for m in self.monsters if m.is_alive()]
+        
+    def _execute_turns(self, player_action, target, round_log):
+        """
+        Run every combatant's turn in initiative order.
+        
+        Returns:
+            True if the player fled
+        """
+        # Initiative is rolled once per combat unless re-rolling each round
+        if self.scheduler is None or self.reroll_initiative:
+            self.roll_initiative()
+            
+        for combatant in self.scheduler:
+            if combatant is self.character:
+                if self._player_turn(player_action, target, round_log):
+                    return True
+            else:
+                # Monster's turn
+                hit, damage, msg = combatant.attack(self.character)
+                round_log.append(msg)
+                if hit:
+                    abilities.run_on_hit(self.hooks, combatant, self.character, self.round, round_log)
+        return False
+        
+    def _execute_mass_turns(self, player_action, target, round_log):
+        """
+        Run a mass-battle round: monsters that beat the player's initiative
+        attack as one vectorized step, then the player acts, then the rest.
+        
+        Returns:
+            True if the player fled
+        """
+        horde = self.horde
+        if self._player_initiative is None or self.reroll_initiative:
+            dex_mod = self.character.dex_mod
+            self._player_initiative = dice.d20(1, dex_mod, self.rng)
+            horde.roll_initiative()
+            
+        alive = horde.alive_rows()
+        goes_first = horde.initiative[alive] > self._player_initiative
+        self._mass_attack(alive[goes_first], round_log)
+        
+        if self._player_turn(player_action, target, round_log):
+            return True
+            
+        later = alive[~goes_first]
+        self._mass_attack(later[horde.current_hp[later] > 0], round_log)
+        return False
+        
+    def _mass_attack(self, rows, round_log):
+        """Resolve attacks from many horde rows at once, logging one line per monster kind"""
+        if rows.size == 0:
+            return
+        total, by_kind = self.horde.attack_by_kind(rows, self.character.armor_class)
+        for kind, name, attackers, hits, damage in by_kind:
+            round_log.append(f"{attackers} x {name} attack {self.character.name}: "
+                             f"{hits} hit for {damage} damage!")
+        if total:
+            self.character.take_damage(total)
+        # On-hit abilities (poison) resolve every hit of a kind at once
+        for kind, name, attackers, hits, damage in by_kind:
+            if hits:
+                abilities.run_kind_on_hit(self.hooks, kind, self.character, self.round, hits,
+                                          round_log)
+            
+    def _player_turn(self, player_action, target, round_log):
+        """
+        Resolve the player's action for this round.
+        
+        Returns:
+            True if the player fled
+        """
+        # Timed effects last until the start of the character's turn, so
+        # Shield cast last round still protects against monsters acting first
+        if self.character.effects:
+            self._expire_effects(round_log)
+            
+        if player_action['type'] == 'attack':
+            if target is not None:
+                weapon_dmg = player_action.get('weapon_damage', '1d8')
+                hit, damage = self.character.attack_roll(target.armor_class, weapon_dmg)
+                
+                if hit:
+                    target.take_damage(damage)
+                    msg = f"{self.character.name} hits {target.name} for {damage} damage!"
+                    if not target.is_alive():
+                        msg += f" {target.name} is defeated!"
+                        if self.scheduler is not None:
+                            self.scheduler.remove(target)
+                else:
+                    msg = f"{self.character.name} misses {target.name}!"
+                round_log.append(msg)
+                
+        elif player_action['type'] == 'spell':
+            spell = player_action['spell']
+            if spell.targets_self:
+                target = None
+            elif spell.area:
+                # Area spells hit every living monster at once
+                target = self.horde if self.horde is not None else self._alive_monsters()
+            success, result = self.character.cast_spell(spell, target)
+            round_log.append(result)
+            
+        elif player_action['type'] == 'item':
+            item_name = player_action['item_name']
+            result = self.character.use_item(item_name)
+            if result:
+                round_log.append(result)
+            else:
+                round_log.append(f"Cannot use {item_name}!")
+                
+        elif player_action['type'] == 'flee':
+            # Attempt to flee (DEX check)
+            flee_roll = dice.d20(1, self.character.dex_mod, self.rng)
+            if flee_roll >= 10:
+                return True
+            round_log.append(f"{self.character.name} fails to flee!")
+        return False
+        
+    def events_since(self, cursor=0):
+        """
+        Get combat log messages added since a cursor.
+        
+        Args:
+            cursor: Position returned by a previous call (0 for the start)
+            
+        Returns:
+            Tuple of (new messages, new cursor)
+        """
+        return self.combat_log[cursor:], len(self.combat_log)
+        
+    def iter_log(self, start=0):
+        """Iterate over the combat log from a position, including messages added while iterating"""
+        position = start
+        while position < len(self.combat_log):
+            yield self.combat_log[position]
+            position += 1
+            
     def _collect_rewards(self):
         """Collect treasure from defeated monsters"""
         rewards = {
@@ -182,7 +378,7 @@ class Combat:
             'experience': 0
         }
         
-        for monster in self.monsters:
+        for monster in self._individual_monsters():
             # Add treasure
             for item in monster.treasure:
                 if 'gold' in item.lower():
@@ -198,9 +394,16 @@ class Combat:
             
         return rewards
         
+    def _individual_monsters(self):
+        """Every individual monster in the fight, with swarms expanded"""
+        for monster in self.monsters:
+            if isinstance(monster, Swarm):
+                yield from monster.members()
+            else:
+                yield monster
+                
     def get_combat_summary(self):
         """Get current combat status summary"""
-        alive_monsters = [m for m in self.monsters if m.is_alive()]
         
         summary = [
             f"\n{'='*50}",
@@ -212,12 +415,205 @@ class Combat:
             f"\nEnemies:"
         ]
         
+        if self.horde is not None:
+            for name, count, hp in self.horde.summary():
+                summary.append(f"  {count} x {name} (total HP {hp})")
+            return '\n'.join(summary)
+            
+        alive_monsters = [m for m in self.monsters if m.is_alive()]
         for i, monster in enumerate(alive_monsters):
             summary.append(f"  [{i}] {monster.name}")
             summary.append(f"      HP: {monster.current_hp}/{monster.max_hp}")
             summary.append(f"      AC: {monster.armor_class}")
             
         return '\n'.join(summary)
+        
+    def simulate(self, n_trials, policy=None, max_rounds=100, rng=None):
+        """
+        Fight this encounter many times in quiet mode.
+        
+        Uses the same rules as execute_round() but builds no messages or
+        log. Each trial starts from the character's current state and
+        re-rolls monster hit points. The real character and monsters are
+        never modified.
+        
+        Args:
+            n_trials: Number of fights to simulate
+            policy: Player action dict (same format as execute_round), or a
+                    function (character, alive_monsters, round) -> action dict.
+                    An optional 'target' key selects the monster index.
+                    Defaults to a 1d8 melee attack.
+            max_rounds: Rounds after which a fight counts as a 'timeout'
+            rng: RNGStream for the simulation (default: the combatants' own)
+            
+        Returns:
+            Dictionary with win_rate, outcome counts, and histograms of
+            rounds, remaining HP and resources used
+        """
+        # Work on copies, sharing spells and random streams with the originals
+        shared = [self.rng, self.character.rng] + self.character.known_spells
+        shared.extend(monster.rng for monster in self.monsters)
+        memo = {id(obj): obj for obj in shared}
+        character, monsters = copy.deepcopy((self.character, self.monsters), memo)
+        if rng is None:
+            rng = self.rng
+        else:
+            character.rng = rng
+            if isinstance(monsters, MonsterTable):
+                monsters.rng = rng
+            else:
+                for monster in monsters:
+                    monster.rng = rng
+                
+        if policy is None:
+            policy = DEFAULT_ACTION
+        if isinstance(policy, dict):
+            fixed_action = policy
+            policy = lambda character, alive_monsters, round_number: fixed_action
+            
+        # Starting state restored before every trial
+        start_hp = character.current_hp
+        start_max_hp = character.max_hp
+        start_ac = character.armor_class
+        start_bab = character.base_attack_bonus
+        start_saves = (character.fortitude_save, character.reflex_save, character.will_save)
+        start_effects = character.effects
+        start_slots = dict(character.spell_slots)
+        start_inventory = character.inventory.copy()
+        start_abilities = [getattr(character, name) for name in ABILITY_SCORES]
+        hooks = abilities.build_hooks(monsters)
+        
+        outcomes = Counter()
+        rounds = Counter()
+        remaining_hp = Counter()
+        slots_used = Counter()
+        items_used = Counter()
+        
+        for _ in range(n_trials):
+            # Effects active at the start keep their expiry rounds in every trial
+            character.effects = (copy.deepcopy(start_effects, {id(character): character})
+                                 if start_effects else EffectTimeline())
+            # Scores first: a changed Con or Dex modifier adjusts HP and AC
+            for name, score in zip(ABILITY_SCORES, start_abilities):
+                setattr(character, name, score)
+            character.max_hp = start_max_hp
+            character.current_hp = start_hp
+            character.armor_class = start_ac
+            character.base_attack_bonus = start_bab
+            character.fortitude_save, character.reflex_save, character.will_save = start_saves
+            character.spell_slots = dict(start_slots)
+            character.inventory = start_inventory.copy()
+            for monster in monsters:
+                monster.reroll_hit_points()
+            if hooks is not None:
+                abilities.reset_hooks(hooks)
+                
+            outcome, fight_rounds = self._simulate_fight(character, monsters, policy, max_rounds,
+                                                         rng, self.reroll_initiative, hooks)
+            
+            outcomes[outcome] += 1
+            rounds[fight_rounds] += 1
+            remaining_hp[max(0, character.current_hp)] += 1
+            slots_used[sum(start_slots.values()) - sum(character.spell_slots.values())] += 1
+            items_used[len(start_inventory) - len(character.inventory)] += 1
+            
+        return {
+            'trials': n_trials,
+            'win_rate': outcomes['victory'] / n_trials if n_trials else 0.0,
+            'outcomes': {key: outcomes[key] for key in ('victory', 'defeat', 'fled', 'timeout')},
+            'rounds': dict(sorted(rounds.items())),
+            'remaining_hp': dict(sorted(remaining_hp.items())),
+            'spell_slots_used': dict(sorted(slots_used.items())),
+            'items_used': dict(sorted(items_used.items()))
+        }
+        
+    def simulate_batch(self, n_trials, weapon_damage="1d8", max_rounds=100, rng=None):
+        """
+        Fight this encounter n times in vectorized lockstep (requires NumPy).
+        
+        Much faster than simulate() for large n, but the player can only
+        make melee attacks against the first living monster.
+        
+        Args:
+            n_trials: Number of fights to simulate
+            weapon_damage: Player weapon damage dice
+            max_rounds: Rounds after which a fight counts as a 'timeout'
+            rng: RNGStream to draw from (default: module-level NumPy generator)
+            
+        Returns:
+            Dictionary with win_rate, outcome counts, and histograms of
+            rounds and remaining HP
+        """
+        from simulation import simulate_lockstep
+        return simulate_lockstep(self.character, list(self._individual_monsters()), n_trials,
+                                 weapon_damage, max_rounds, rng, self.reroll_initiative)
+        
+    @staticmethod
+    def _simulate_fight(character, monsters, policy, max_rounds, rng, reroll_initiative=False,
+                        hooks=None):
+        """
+        Run one quiet fight to the end.
+        
+        hooks is the special-ability dispatch table for these monsters
+        (see abilities.build_hooks), reset for this fight.
+        
+        Returns:
+            Tuple of (outcome, rounds) where outcome is 'victory', 'defeat',
+            'fled' or 'timeout'
+        """
+        dex_mod = character.dex_mod
+        scheduler = None
+        
+        for round_number in range(1, max_rounds + 1):
+            alive_monsters = [m for m in monsters if m.is_alive()]
+            action = policy(character, alive_monsters, round_number)
+            action_type = action['type']
+            target_index = action.get('target', 0)
+            
+            if scheduler is None or reroll_initiative:
+                scheduler = TurnScheduler(character, monsters, rng)
+                
+            if hooks is not None:
+                abilities.run_phase(hooks, 'pre_round', character, round_number)
+                
+            for combatant in scheduler:
+                if combatant is character:
+                    if character.effects:
+                        character.effects.tick()
+                    target = alive_monsters[target_index] if target_index < len(alive_monsters) else None
+                    if action_type == 'attack':
+                        if target is not None:
+                            hit, damage = character.attack_roll(target.armor_class, action.get('weapon_damage', '1d8'))
+                            if hit:
+                                target.take_damage(damage)
+                    elif action_type == 'spell':
+                        spell = action['spell']
+                        if spell.targets_self:
+                            target = None
+                        elif spell.area:
+                            target = [m for m in alive_monsters if m.is_alive()]
+                        character.cast_spell(spell, target)
+                    elif action_type == 'item':
+                        character.use_item(action['item_name'])
+                    elif action_type == 'flee':
+                        if dice.d20(1, dex_mod, rng) >= 10:
+                            return 'fled', round_number
+                else:
+                    hit, damage = combatant.attack_roll(character.armor_class)
+                    if hit:
+                        character.take_damage(damage)
+                        if hooks is not None:
+                            abilities.run_on_hit(hooks, combatant, character, round_number)
+                            
+            if hooks is not None:
+                abilities.run_phase(hooks, 'post_round', character, round_number)
+                
+            if not character.is_alive():
+                return 'defeat', round_number
+            if not any(m.is_alive() for m in monsters):
+                return 'victory', round_number
+                
+        return 'timeout', max_rounds
 
 
 class Item:
@@ -244,7 +640,7 @@ class HealingPotion(Item):
         )
         
     def use(self, character):
-        healing = dice.d4(2, 2)
+        healing = dice.d4(2, 2, character.rng)
         character.heal(healing)
         return f"{character.name} drinks a healing potion and recovers {healing} HP! ({character.current_hp}/{character.max_hp})"
 
@@ -2,9 +2,180 @@
 Dice rolling utilities for D20 system
 """
 import random
+import re
+from bisect import bisect_left
+from collections import OrderedDict
+from itertools import accumulate
 
+try:
+    from math import comb
+except ImportError:
+    # math.comb is new in Python 3.8
+    def comb(n, k):
+        """Number of ways to choose k items from n"""
+        if k < 0 or k > n:
+            return 0
+        k = min(k, n - k)
+        result = 1
+        for i in range(1, k + 1):
+            result = result * (n - k + i) // i
+        return result
 
-def roll(sides, count=1, modifier=0):
+# NumPy is optional - it is only needed for the batched *_many helpers
+try:
+    import numpy as np
+    NUMPY_ENABLED = True
+except ImportError:
+    np = None
+    NUMPY_ENABLED = False
+
+
+class RNGStream:
+    """
+    Independent, seedable random number stream.
+    
+    Give each game session or simulation worker its own stream so runs can
+    be reproduced and threads don't share the global generator. Every dice
+    function takes an optional rng argument; None means the global random
+    module, which stays the default.
+    """
+    
+    def __init__(self, seed=None):
+        self.seed = seed
+        self._random = random.Random(seed)
+        self._numpy = None
+        self._bind()
+        
+    def _bind(self):
+        """Bind the fast randint(a, b) entry point used by the dice helpers"""
+        self.randint = self._random.randint
+        
+    def sum_dice(self, sides, count):
+        """Sum of count dice with the given number of sides"""
+        randint = self.randint
+        if count == 1:
+            return randint(1, sides)
+        return sum(randint(1, sides) for _ in range(count))
+        
+    def split(self, count=None):
+        """
+        Derive independent child streams, e.g. one per worker.
+        
+        Args:
+            count: Number of streams to create (None for a single stream)
+            
+        Returns:
+            RNGStream, or list of RNGStreams when count is given
+        """
+        if count is None:
+            return RNGStream(self._random.getrandbits(64))
+        return [RNGStream(self._random.getrandbits(64)) for _ in range(count)]
+        
+    def numpy(self):
+        """NumPy Generator derived from this stream (for batched rolls)"""
+        if self._numpy is None:
+            _require_numpy()
+            self._numpy = np.random.default_rng(self._random.getrandbits(64))
+        return self._numpy
+        
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['randint']  # Bound methods are rebuilt on unpickle
+        return state
+        
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._bind()
+        
+    def __repr__(self):
+        return f"RNGStream(seed={self.seed!r})"
+
+
+# Die sizes served from pre-generated blocks by PooledStream
+POOLED_SIDES = (4, 6, 8, 10, 12, 20, 100)
+
+
+class PooledStream(RNGStream):
+    """
+    RNGStream that serves d4-d100 faces from large pre-generated blocks.
+    
+    Blocks are refilled in bulk (with NumPy when available, otherwise
+    random.choices), which removes most of the per-call cost of
+    random.randint in headless simulations. Draws are still independent
+    and uniform, so results are statistically identical to RNGStream.
+    Other ranges fall back to ordinary randint calls.
+    
+    Counters:
+        hits: Faces served from a pool
+        refills: Blocks generated
+        misses: Draws outside the pooled die sizes
+    """
+    
+    def __init__(self, seed=None, block_size=4096):
+        self.block_size = block_size
+        self.hits = 0
+        self.refills = 0
+        self.misses = 0
+        self._pools = {sides: [[], 0] for sides in POOLED_SIDES}  # sides -> [block, position]
+        super().__init__(seed)
+        
+    def _bind(self):
+        self.randint = self._pooled_randint
+        
+    def _refill(self, sides):
+        """Generate a fresh block of faces for one die size"""
+        self.refills += 1
+        if NUMPY_ENABLED:
+            return self.numpy().integers(1, sides + 1, size=self.block_size).tolist()
+        return self._random.choices(range(1, sides + 1), k=self.block_size)
+        
+    def _pooled_randint(self, a, b):
+        pool = self._pools.get(b) if a == 1 else None
+        if pool is None:
+            self.misses += 1
+            return self._random.randint(a, b)
+            
+        block, position = pool
+        if position == len(block):
+            block = pool[0] = self._refill(b)
+            position = 0
+        pool[1] = position + 1
+        self.hits += 1
+        return block[position]
+        
+    def sum_dice(self, sides, count):
+        pool = self._pools.get(sides)
+        if pool is None:
+            return super().sum_dice(sides, count)
+            
+        block, position = pool
+        end = position + count
+        if count == 1 and end <= len(block):
+            pool[1] = end
+            self.hits += 1
+            return block[position]
+        while end > len(block):
+            # Keep the unused tail and append fresh blocks
+            block = block[position:] + self._refill(sides)
+            position, end = 0, count
+        pool[0], pool[1] = block, end
+        self.hits += count
+        return sum(block[position:end])
+        
+    def stats(self):
+        """
+        Get pool counters.
+        
+        Returns:
+            Dictionary with hits, misses and refills
+        """
+        return {'hits': self.hits, 'misses': self.misses, 'refills': self.refills}
+        
+    def __repr__(self):
+        return f"PooledStream(seed={self.seed!r}, block_size={self.block_size})"
+
+
+def roll(sides, count=1, modifier=0, rng=None):
     """
     Roll dice with modifier.
     
@@ -12,57 +183,65 @@ def roll(sides, count=1, modifier=0):
         sides: Number of sides on the die
         count: Number of dice to roll
         modifier: Modifier to add to the result
+        rng: RNGStream to draw from (default: global random module)
         
     Returns:
         Total result of the roll
     """
-    total = sum(random.randint(1, sides) for _ in range(count))
+    if rng is None:
+        total = sum(random.randint(1, sides) for _ in range(count))
+    else:
+        total = rng.sum_dice(sides, count)
     return total + modifier
 
 
-def d4(count=1, modifier=0):
+def d4(count=1, modifier=0, rng=None):
     """Roll d4"""
-    return roll(4, count, modifier)
+    return roll(4, count, modifier, rng)
 
 
-def d6(count=1, modifier=0):
+def d6(count=1, modifier=0, rng=None):
     """Roll d6"""
-    return roll(6, count, modifier)
+    return roll(6, count, modifier, rng)
 
 
-def d8(count=1, modifier=0):
+def d8(count=1, modifier=0, rng=None):
     """Roll d8"""
-    return roll(8, count, modifier)
+    return roll(8, count, modifier, rng)
 
 
-def d10(count=1, modifier=0):
+def d10(count=1, modifier=0, rng=None):
     """Roll d10"""
-    return roll(10, count, modifier)
+    return roll(10, count, modifier, rng)
 
 
-def d12(count=1, modifier=0):
+def d12(count=1, modifier=0, rng=None):
     """Roll d12"""
-    return roll(12, count, modifier)
+    return roll(12, count, modifier, rng)
 
 
-def d20(count=1, modifier=0):
+def d20(count=1, modifier=0, rng=None):
     """Roll d20"""
-    return roll(20, count, modifier)
+    return roll(20, count, modifier, rng)
 
 
-def d100(count=1, modifier=0):
+def d100(count=1, modifier=0, rng=None):
     """Roll d100 (percentile)"""
-    return roll(100, count, modifier)
+    return roll(100, count, modifier, rng)
 
 
-def ability_score():
+def ability_score(rng=None):
     """
     Roll 4d6 and drop lowest, standard method for ability scores.
     
+    Args:
+        rng: RNGStream to draw from (default: global random module)
+        
     Returns:
         Ability score (3-18)
     """
-    rolls = [random.randint(1, 6) for _ in range(4)]
+    randint = random.randint if rng is None else rng.randint
+    rolls = [randint(1, 6) for _ in range(4)]
     rolls.sort()
     return sum(rolls[1:])  # Drop lowest
 
@@ -78,3 +257,580 @@ def modifier(score):
         Modifier value
     """
     return (score - 10) // 2
+
+
+# Compiled dice expressions
+
+_TERM_RE = re.compile(r"([+-])(?:(\d*)d(\d+|%)(?:(kh|kl)(\d+)|(adv|dis))?|(\d+))")
+
+# Parsed expressions by string, least recently used first
+EXPR_CACHE_SIZE = 1024
+_EXPR_CACHE = OrderedDict()
+
+
+class DiceExpr:
+    """
+    A dice expression parsed once into terms, e.g. '2d8+7', '4d6kh3',
+    '1d20adv' or '1d8+1d6-1'.
+    
+    Each dice term is a tuple (sign, count, sides, keep) where keep is
+    None, ('h', n), ('l', n), 'adv' or 'dis'. Flat numbers are summed into
+    the modifier.
+    """
+    
+    def __init__(self, text, terms, modifier=0):
+        self.text = text
+        self.terms = tuple(terms)
+        self.modifier = modifier
+        
+        # Fast path for the common 'XdY+Z' shape
+        self._simple = len(self.terms) == 1 and self.terms[0][0] == 1 and self.terms[0][3] is None
+        self._distribution = None
+        
+    @property
+    def dice_count(self):
+        """Total number of dice rolled by the expression"""
+        return sum(count for _, count, _, _ in self.terms)
+        
+    def roll(self, rng=None):
+        """
+        Roll the expression.
+        
+        Args:
+            rng: RNGStream to draw from (default: global random module)
+            
+        Returns:
+            Total result of the roll
+        """
+        if self._simple:
+            _, count, sides, _ = self.terms[0]
+            return roll(sides, count, self.modifier, rng)
+            
+        randint = random.randint if rng is None else rng.randint
+        total = self.modifier
+        for sign, count, sides, keep in self.terms:
+            total += sign * _roll_term(count, sides, keep, randint)
+        return total
+        
+    def distribution(self):
+        """
+        Exact probability distribution of the expression (computed once).
+        
+        Returns:
+            Distribution instance
+        """
+        if self._distribution is None:
+            low, counts, total = self.modifier, [1], 1
+            for sign, count, sides, keep in self.terms:
+                t_low, t_counts = _term_counts(count, sides, keep)
+                if sign < 0:
+                    t_low, t_counts = -(t_low + len(t_counts) - 1), t_counts[::-1]
+                low, counts = _convolve(low, counts, t_low, t_counts)
+                total *= sum(t_counts)
+            self._distribution = Distribution(low, counts, total)
+        return self._distribution
+        
+    def __repr__(self):
+        return f"DiceExpr({self.text!r})"
+        
+    def __str__(self):
+        return self.text
+
+
+def _roll_term(count, sides, keep, randint):
+    """Roll a single dice term, applying keep-highest/lowest or advantage"""
+    if keep is None:
+        return sum(randint(1, sides) for _ in range(count))
+    if keep == 'adv':
+        return max(_roll_term(count, sides, None, randint), _roll_term(count, sides, None, randint))
+    if keep == 'dis':
+        return min(_roll_term(count, sides, None, randint), _roll_term(count, sides, None, randint))
+        
+    mode, kept = keep
+    rolls = sorted(randint(1, sides) for _ in range(count))
+    if mode == 'h':
+        return sum(rolls[count - kept:])
+    return sum(rolls[:kept])
+
+
+class Distribution:
+    """
+    Exact distribution of a dice expression, stored as integer outcome
+    counts so probabilities are exact ratios.
+    
+    counts[i] is the number of ways to roll low + i, out of total.
+    """
+    
+    def __init__(self, low, counts, total):
+        # Trim impossible outcomes from both ends
+        start = next(i for i, c in enumerate(counts) if c)
+        end = len(counts) - next(i for i, c in enumerate(reversed(counts)) if c)
+        self.low = low + start
+        self.counts = counts[start:end]
+        self.total = total
+        self._cumulative = None  # Built on first sample()
+        
+    @property
+    def min_value(self):
+        """Smallest possible result"""
+        return self.low
+        
+    @property
+    def max_value(self):
+        """Largest possible result"""
+        return self.low + len(self.counts) - 1
+        
+    @property
+    def mean(self):
+        """Expected value"""
+        return sum((self.low + i) * c for i, c in enumerate(self.counts)) / self.total
+        
+    @property
+    def variance(self):
+        """Variance of the result"""
+        s1 = sum((self.low + i) * c for i, c in enumerate(self.counts))
+        s2 = sum((self.low + i) ** 2 * c for i, c in enumerate(self.counts))
+        return (self.total * s2 - s1 * s1) / (self.total * self.total)
+        
+    def probability(self, value):
+        """Probability of rolling exactly value"""
+        index = value - self.low
+        if 0 <= index < len(self.counts):
+            return self.counts[index] / self.total
+        return 0.0
+        
+    def cdf(self, value):
+        """Probability of rolling value or less"""
+        index = value - self.low
+        if index < 0:
+            return 0.0
+        return sum(self.counts[:index + 1]) / self.total
+        
+    def pmf(self):
+        """
+        Get the probability mass function.
+        
+        Returns:
+            Dictionary of {result: probability}
+        """
+        return {self.low + i: c / self.total for i, c in enumerate(self.counts) if c}
+        
+    def clamp(self, minimum):
+        """
+        Distribution of max(minimum, result), e.g. damage that is always at least 1.
+        
+        Returns:
+            New Distribution instance
+        """
+        if minimum <= self.low:
+            return self
+        if minimum > self.max_value:
+            return Distribution(minimum, [self.total], self.total)
+        cut = minimum - self.low
+        return Distribution(minimum, [sum(self.counts[:cut + 1])] + self.counts[cut + 1:], self.total)
+        
+    def repeat(self, times):
+        """
+        Distribution of the sum of several independent results, e.g. the
+        total damage of 12 hits.
+        
+        Args:
+            times: Number of results summed (0 gives a constant 0)
+            
+        Returns:
+            New Distribution instance
+        """
+        low, counts, total = 0, [1], 1
+        base_low, base, base_total = self.low, self.counts, self.total
+        # Square-and-multiply so large counts need O(log times) convolutions
+        while times:
+            if times & 1:
+                low, counts = _convolve(low, counts, base_low, base)
+                total *= base_total
+            times >>= 1
+            if times:
+                base_low, base = _convolve(base_low, base, base_low, base)
+                base_total *= base_total
+        return Distribution(low, counts, total)
+        
+    def sample(self, rng=None):
+        """
+        Draw one result with exactly this distribution.
+        
+        Args:
+            rng: RNGStream to draw from (default: global random module)
+            
+        Returns:
+            Sampled result
+        """
+        if self._cumulative is None:
+            self._cumulative = list(accumulate(self.counts))
+        randint = random.randint if rng is None else rng.randint
+        return self.low + bisect_left(self._cumulative, randint(1, self.total))
+        
+    def __repr__(self):
+        return f"Distribution({self.min_value}..{self.max_value}, mean={self.mean:.3f})"
+
+
+def _convolve(a_low, a, b_low, b):
+    """Convolve two count lists (distribution of the sum)"""
+    out = [0] * (len(a) + len(b) - 1)
+    for i, x in enumerate(a):
+        if x:
+            for j, y in enumerate(b):
+                out[i + j] += x * y
+    return a_low + b_low, out
+
+
+def _term_counts(count, sides, keep):
+    """Outcome counts (low, counts) for a single positive dice term"""
+    if keep is None:
+        low, counts = 0, [1]
+        for _ in range(count):
+            low, counts = _convolve(low, counts, 1, [1] * sides)
+        return low, counts
+        
+    if keep in ('adv', 'dis'):
+        low, counts = _term_counts(count, sides, None)
+        total = sum(counts)
+        cumulative = []
+        running = 0
+        for c in counts:
+            running += c
+            cumulative.append(running)
+        if keep == 'adv':
+            # P(max <= x) = P(X <= x)^2
+            below = [0] + cumulative[:-1]
+            return low, [cumulative[i] ** 2 - below[i] ** 2 for i in range(len(counts))]
+        # P(min >= x) = P(X >= x)^2
+        at_least = [total - b for b in [0] + cumulative[:-1]]
+        above = at_least[1:] + [0]
+        return low, [at_least[i] ** 2 - above[i] ** 2 for i in range(len(counts))]
+        
+    # Keep highest/lowest: walk faces from the kept end, choosing how many
+    # dice show each face. State is (dice placed, dice kept, kept sum).
+    mode, kept = keep
+    faces = range(sides, 0, -1) if mode == 'h' else range(1, sides + 1)
+    states = {(0, 0, 0): 1}
+    for face in faces:
+        new_states = {}
+        for (placed, taken, total), ways in states.items():
+            for c in range(count - placed + 1):
+                take = min(c, kept - taken)
+                key = (placed + c, taken + take, total + take * face)
+                new_states[key] = new_states.get(key, 0) + ways * comb(count - placed, c)
+        states = new_states
+        
+    sums = {}
+    for (placed, _, total), ways in states.items():
+        if placed == count:
+            sums[total] = sums.get(total, 0) + ways
+    low = min(sums)
+    return low, [sums.get(v, 0) for v in range(low, max(sums) + 1)]
+
+
+def binomial(trials, successes, outcomes=20):
+    """
+    Exact distribution of the number of successes in independent trials,
+    e.g. how many of 12 goblins hit when each hits on 9 of 20 faces.
+    
+    Args:
+        trials: Number of trials
+        successes: Outcomes per trial that count as a success
+        outcomes: Equally likely outcomes per trial (default: d20 faces)
+        
+    Returns:
+        Distribution instance over 0..trials
+    """
+    successes = max(0, min(outcomes, successes))
+    failures = outcomes - successes
+    counts = [comb(trials, k) * successes ** k * failures ** (trials - k)
+              for k in range(trials + 1)]
+    return Distribution(0, counts, outcomes ** trials)
+
+
+def distribution(expr):
+    """
+    Exact probability distribution of a dice expression (memoized).
+    
+    Args:
+        expr: Dice string (e.g., '2d8+7') or DiceExpr
+        
+    Returns:
+        Distribution instance with mean, variance, cdf() and pmf()
+    """
+    return parse(expr).distribution()
+
+
+class AliasSampler:
+    """
+    Walker alias table for O(1) sampling of a Distribution.
+    
+    The outcomes are split into n equal-width columns, each holding at most
+    two outcomes: its own and an alias. One uniform draw picks a column and
+    a point in it, so a sample costs one draw and one table lookup however
+    many dice the expression has. Thresholds are integers out of the
+    distribution's total, so sampling stays exact.
+    """
+    
+    __slots__ = ('low', 'total', 'threshold', 'alias', 'draws')
+    
+    def __init__(self, dist):
+        """
+        Build the table (Vose's method).
+        
+        Args:
+            dist: Distribution to sample from
+        """
+        n = len(dist.counts)
+        total = dist.total
+        self.low = dist.low
+        self.total = total
+        self.draws = n * total
+        
+        # Column i keeps its own outcome for draws below threshold[i]
+        scaled = [count * n for count in dist.counts]
+        self.threshold = [total] * n
+        self.alias = list(range(n))
+        small = [i for i, weight in enumerate(scaled) if weight < total]
+        large = [i for i, weight in enumerate(scaled) if weight >= total]
+        while small and large:
+            less = small.pop()
+            more = large.pop()
+            self.threshold[less] = scaled[less]
+            self.alias[less] = more
+            scaled[more] -= total - scaled[less]
+            if scaled[more] < total:
+                small.append(more)
+            else:
+                large.append(more)
+        
+    def sample(self, rng=None):
+        """
+        Draw one result.
+        
+        Args:
+            rng: RNGStream to draw from (default: global random module)
+            
+        Returns:
+            Sampled result
+        """
+        randint = random.randint if rng is None else rng.randint
+        column, point = divmod(randint(1, self.draws) - 1, self.total)
+        if point < self.threshold[column]:
+            return self.low + column
+        return self.low + self.alias[column]
+        
+    def __repr__(self):
+        return f"AliasSampler({self.low}..{self.low + len(self.alias) - 1})"
+
+
+# Alias tables by DiceExpr, least recently used first
+SAMPLER_CACHE_SIZE = 256
+_SAMPLER_CACHE = OrderedDict()
+
+
+def sampler(expr):
+    """
+    O(1) sampler for a dice expression, built on first use (LRU cached).
+    
+    Use it in place of roll_expr for expressions rolled many times, e.g.
+    dice.sampler("13d12+39").sample(rng). Results follow the exact
+    distribution of the expression, but the random stream is consumed
+    differently than by rolling each die.
+    
+    Args:
+        expr: Dice string (e.g., '8d6', '4d6kh3') or DiceExpr
+        
+    Returns:
+        AliasSampler instance
+    """
+    compiled = parse(expr)
+    table = _SAMPLER_CACHE.get(compiled)
+    if table is None:
+        table = _SAMPLER_CACHE[compiled] = AliasSampler(compiled.distribution())
+        if len(_SAMPLER_CACHE) > SAMPLER_CACHE_SIZE:
+            _SAMPLER_CACHE.popitem(last=False)
+    else:
+        _SAMPLER_CACHE.move_to_end(compiled)
+    return table
+
+
+def parse(expr):
+    """
+    Parse a dice expression string into a cached DiceExpr (LRU cached).
+    
+    Args:
+        expr: Dice string such as '2d8+7', '4d6kh3', '1d20adv', '3' or a DiceExpr
+        
+    Returns:
+        DiceExpr instance (the same object for the same string while it
+        stays among the EXPR_CACHE_SIZE most recently parsed)
+        
+    Raises:
+        ValueError: If the expression is not valid dice notation
+    """
+    if isinstance(expr, DiceExpr):
+        return expr
+        
+    compiled = _EXPR_CACHE.get(expr)
+    if compiled is None:
+        compiled = _EXPR_CACHE[expr] = _compile(expr)
+        if len(_EXPR_CACHE) > EXPR_CACHE_SIZE:
+            _EXPR_CACHE.popitem(last=False)
+    else:
+        _EXPR_CACHE.move_to_end(expr)
+    return compiled
+
+
+def _compile(expr):
+    """Compile a dice string into a DiceExpr"""
+    if isinstance(expr, int):
+        return DiceExpr(str(expr), [], expr)
+    if not isinstance(expr, str):
+        raise ValueError(f"Invalid dice expression: {expr!r}")
+        
+    text = expr.replace(' ', '').lower()
+    if not text:
+        raise ValueError(f"Invalid dice expression: {expr!r}")
+    if text[0] not in '+-':
+        text = '+' + text
+        
+    terms = []
+    flat = 0
+    pos = 0
+    while pos < len(text):
+        match = _TERM_RE.match(text, pos)
+        if not match:
+            raise ValueError(f"Invalid dice expression: {expr!r}")
+        sign_str, count, sides, keep_mode, keep_n, adv, number = match.groups()
+        sign = -1 if sign_str == '-' else 1
+        
+        if number is not None:
+            flat += sign * int(number)
+        else:
+            count = int(count) if count else 1
+            sides = 100 if sides == '%' else int(sides)
+            if count < 1 or sides < 1:
+                raise ValueError(f"Invalid dice expression: {expr!r}")
+            if keep_mode:
+                keep_n = int(keep_n)
+                if not 1 <= keep_n <= count:
+                    raise ValueError(f"Invalid keep count in dice expression: {expr!r}")
+                keep = (keep_mode[1], keep_n)
+            else:
+                keep = adv
+            terms.append((sign, count, sides, keep))
+        pos = match.end()
+        
+    return DiceExpr(expr, terms, flat)
+
+
+def roll_expr(expr, rng=None):
+    """
+    Roll a dice expression string (e.g., '2d6+3').
+    
+    Args:
+        expr: Dice string or DiceExpr
+        rng: RNGStream to draw from (default: global random module)
+        
+    Returns:
+        Total result of the roll
+    """
+    return parse(expr).roll(rng)
+
+
+# Batched rolls for offline simulations (requires NumPy)
+
+_np_rng = np.random.default_rng() if NUMPY_ENABLED else None
+
+
+def _require_numpy():
+    """Raise a clear error when a batched helper is used without NumPy"""
+    if not NUMPY_ENABLED:
+        raise ImportError("NumPy is required for batched dice rolls (pip install numpy)")
+
+
+def _np_generator(rng):
+    """NumPy Generator for an RNGStream, or the module default"""
+    _require_numpy()
+    return _np_rng if rng is None else rng.numpy()
+
+
+def roll_many(sides, count=1, n=1, modifier=0, rng=None):
+    """
+    Roll the same dice n times in one vectorized draw.
+    
+    Args:
+        sides: Number of sides on the die
+        count: Number of dice in each roll
+        n: Number of independent rolls
+        modifier: Modifier added to every total (int or array of length n)
+        rng: RNGStream to draw from (default: module-level NumPy generator)
+        
+    Returns:
+        NumPy array of n totals
+    """
+    rolls = _np_generator(rng).integers(1, sides + 1, size=(n, count))
+    return rolls.sum(axis=1) + modifier
+
+
+def d20_many(n, modifier=0, rng=None):
+    """
+    Roll n d20s at once.
+    
+    Args:
+        n: Number of rolls
+        modifier: Modifier added to every roll (int or array of length n)
+        rng: RNGStream to draw from (default: module-level NumPy generator)
+        
+    Returns:
+        NumPy array of n results
+    """
+    return _np_generator(rng).integers(1, 21, size=n) + modifier
+
+
+def roll_expr_many(expr, n, rng=None):
+    """
+    Roll a dice expression n times in vectorized draws.
+    
+    Args:
+        expr: Dice string (e.g., '2d8+7', '4d6kh3') or DiceExpr
+        n: Number of independent rolls
+        rng: RNGStream to draw from (default: module-level NumPy generator)
+        
+    Returns:
+        NumPy array of n totals
+    """
+    generator = _np_generator(rng)
+    compiled = parse(expr)
+    total = np.full(n, compiled.modifier, dtype=np.int64)
+    for sign, count, sides, keep in compiled.terms:
+        term = _roll_term_many(generator, count, sides, keep, n)
+        if sign < 0:
+            total -= term
+        else:
+            total += term
+    return total
+
+
+def _roll_term_many(generator, count, sides, keep, n):
+    """Vectorized version of _roll_term"""
+    if keep is None:
+        # One die at a time keeps memory at O(n) for big dice pools
+        total = generator.integers(1, sides + 1, size=n)
+        for _ in range(count - 1):
+            total += generator.integers(1, sides + 1, size=n)
+        return total
+    if keep == 'adv':
+        return np.maximum(_roll_term_many(generator, count, sides, None, n),
+                          _roll_term_many(generator, count, sides, None, n))
+    if keep == 'dis':
+        return np.minimum(_roll_term_many(generator, count, sides, None, n),
+                          _roll_term_many(generator, count, sides, None, n))
+        
+    mode, kept = keep
+    rolls = np.sort(generator.integers(1, sides + 1, size=(n, count)), axis=1)
+    if mode == 'h':
+        return rolls[:, count - kept:].sum(axis=1)
+    return rolls[:, :kept].sum(axis=1)
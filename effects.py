@@ -0,0 +1,177 @@
+"""
+Timed effects: buffs and debuffs that wear off after a number of rounds
+
+An EffectTimeline keeps active effects in a min-heap ordered by the round
+they expire, so applying an effect and reverting it are both O(log n) and
+advancing the clock only touches the effects that actually end. Effects are
+additive modifiers to an attribute (AC +4, attack bonus +1, strength -2),
+so reverting one subtracts exactly what it added, in any order.
+
+Durations use the same strings as Spell.duration ("1 round", "1 minute",
+"Concentration, up to 1 minute"); see duration_rounds().
+"""
+import heapq
+import re
+
+# D20 time units in 6-second rounds
+ROUNDS_PER_UNIT = {
+    'round': 1,
+    'minute': 10,
+    'hour': 600,
+    'day': 14400,
+}
+
+_DURATION_RE = re.compile(r'(\d+)\s*(round|minute|hour|day)s?', re.IGNORECASE)
+
+
+def duration_rounds(duration):
+    """
+    Convert a duration string to a number of rounds.
+    
+    Args:
+        duration: Duration such as "1 round", "10 minutes" or
+                  "Concentration, up to 1 minute"
+    
+    Returns:
+        Number of rounds, 0 for instantaneous effects, or None for
+        durations with no fixed end (e.g. "Permanent", "Until dispelled")
+    """
+    text = duration.strip().lower()
+    if not text or text.startswith('instant'):
+        return 0
+    match = _DURATION_RE.search(text)
+    if match is None:
+        return None
+    count, unit = match.groups()
+    return int(count) * ROUNDS_PER_UNIT[unit.lower()]
+
+
+class TimedEffect:
+    """One active modifier on a target"""
+    
+    __slots__ = ('name', 'target', 'attribute', 'amount', 'expires')
+    
+    def __init__(self, name, target, attribute, amount, expires):
+        self.name = name
+        self.target = target
+        self.attribute = attribute
+        self.amount = amount
+        self.expires = expires
+    
+    def apply(self):
+        """Add the modifier to the target"""
+        setattr(self.target, self.attribute, getattr(self.target, self.attribute) + self.amount)
+    
+    def revert(self):
+        """Take the modifier back off the target"""
+        setattr(self.target, self.attribute, getattr(self.target, self.attribute) - self.amount)
+    
+    def __repr__(self):
+        return (f"TimedEffect({self.name!r}, {self.attribute} {self.amount:+d}, "
+                f"expires={self.expires})")
+
+
+class EffectTimeline:
+    """
+    Active timed effects ordered by expiry round.
+    
+    The timeline keeps its own round counter (now), advanced by tick().
+    Combat ticks the character's timeline at the start of the character's
+    turn, so an effect lasting 1 round ends when its caster next acts.
+    """
+    
+    __slots__ = ('now', '_heap', '_counter')
+    
+    def __init__(self):
+        self.now = 0
+        self._heap = []
+        # Tie-breaker so effects expiring together revert in the order added
+        self._counter = 0
+    
+    def add(self, name, target, modifiers, duration):
+        """
+        Apply modifiers to a target until the duration runs out.
+        
+        Args:
+            name: Effect name for log messages, e.g. "Bless"
+            target: Object whose attributes are modified
+            modifiers: Dictionary of attribute -> amount to add
+            duration: Number of rounds, or a duration string (see
+                      duration_rounds)
+        
+        Returns:
+            List of the TimedEffects added (empty for instantaneous
+            durations; durations with no end are applied permanently)
+        """
+        rounds = duration_rounds(duration) if isinstance(duration, str) else duration
+        if rounds == 0:
+            return []
+        
+        added = []
+        for attribute, amount in modifiers.items():
+            if rounds is None:
+                setattr(target, attribute, getattr(target, attribute) + amount)
+                continue
+            effect = TimedEffect(name, target, attribute, amount, self.now + rounds)
+            effect.apply()
+            heapq.heappush(self._heap, (effect.expires, self._counter, effect))
+            self._counter += 1
+            added.append(effect)
+        return added
+    
+    def tick(self, rounds=1):
+        """
+        Advance the clock and revert every effect that has run out.
+        
+        Args:
+            rounds: Number of rounds to advance
+        
+        Returns:
+            List of expired TimedEffects, in expiry order
+        """
+        self.now += rounds
+        expired = []
+        heap = self._heap
+        while heap and heap[0][0] <= self.now:
+            effect = heapq.heappop(heap)[2]
+            effect.revert()
+            expired.append(effect)
+        return expired
+    
+    def copy(self, retarget=None):
+        """
+        Copy the timeline, e.g. for a forked character.
+        
+        Args:
+            retarget: Dictionary of id(old target) -> new target for
+                      effects that should point at a copy of their target
+        
+        Returns:
+            EffectTimeline with the same clock and expiry order
+        """
+        timeline = EffectTimeline()
+        timeline.now = self.now
+        timeline._counter = self._counter
+        retarget = retarget or {}
+        for expires, order, effect in self._heap:
+            target = retarget.get(id(effect.target), effect.target)
+            copied = TimedEffect(effect.name, target, effect.attribute, effect.amount, expires)
+            timeline._heap.append((expires, order, copied))
+        return timeline
+    
+    def clear(self):
+        """Revert every active effect (e.g. when combat ends or on rest)"""
+        for _, _, effect in self._heap:
+            effect.revert()
+        self._heap.clear()
+    
+    def active(self, target=None):
+        """Active effects, soonest to expire first, optionally for one target"""
+        return [effect for _, _, effect in sorted(self._heap)
+                if target is None or effect.target is target]
+    
+    def __len__(self):
+        return len(self._heap)
+    
+    def __bool__(self):
+        return bool(self._heap)
@@ -103,7 +103,7 @@ def run_example():
             print(f"\n   Round {round_num}:")
             combat_result = combat.execute_round({'type': 'attack', 'weapon_damage': '1d8+3'})
             
-            for log_msg in combat_result['log'][-3:]:  # Show last 3 messages
+            for log_msg in combat_result['log']:  # This round's messages
                 print(f"     {log_msg}")
             
             if combat_result['status'] != 'ongoing':
@@ -12,22 +12,71 @@ class GameEngine:
     Main game engine that manages the adventure flow.
     """
     
-    def __init__(self, adventure, character):
+    def __init__(self, adventure, character, rng=None):
         """
         Initialize the game engine.
         
         Args:
             adventure: Adventure instance
             character: Player Character instance
+            rng: RNGStream for this session (default: global generator).
+                 Pass dice.RNGStream(seed) for a reproducible run.
         """
         self.adventure = adventure
         self.character = character
+        self.rng = rng
+        if rng is not None:
+            character.rng = rng
         self.current_node = adventure.get_starting_node()
         self.game_over = False
         self.victory = False
         self.visited_nodes = set()
         self.game_log = []
         
+    def fork(self, rng=None):
+        """
+        Copy the session for what-if search (e.g. trying every choice).
+        
+        The adventure graph is shared copy-on-write (see Adventure.fork)
+        and the character is forked, so a fork costs a few small copies
+        rather than a deepcopy. Moves made in the fork don't affect this
+        session.
+        
+        Args:
+            rng: RNGStream for the fork (default: share this session's)
+            
+        Returns:
+            GameEngine in the same state
+        """
+        fork = GameEngine.__new__(GameEngine)
+        fork.adventure = self.adventure.fork()
+        fork.character = self.character.fork()
+        fork.rng = self.rng
+        if rng is not None:
+            fork.rng = fork.character.rng = rng
+        fork._copy_progress(self)
+        return fork
+        
+    def restore(self, snapshot):
+        """
+        Return to the state of a snapshot taken with fork().
+        
+        The character is restored in place; the snapshot is left unchanged
+        and can be restored again.
+        """
+        self.adventure = snapshot.adventure.fork()
+        self.character.restore(snapshot.character)
+        self._copy_progress(snapshot)
+        
+    def _copy_progress(self, other):
+        """Copy position, flags, visited nodes and log from another session"""
+        self.current_node = (self.adventure.get_node(other.current_node.node_id)
+                             if other.current_node is not None else None)
+        self.game_over = other.game_over
+        self.victory = other.victory
+        self.visited_nodes = set(other.visited_nodes)
+        self.game_log = list(other.game_log)
+        
     def start_game(self):
         """Start the game and return initial display"""
         self._log(f"\n{'='*60}")
@@ -78,7 +127,7 @@ class GameEngine:
         event_messages = self.current_node.execute_on_enter(self.character)
         
         # Check for traps
-        trap_messages = self.current_node.trigger_traps(self.character)
+        trap_messages = self.current_node.trigger_traps(self.character, self.rng)
         
         # Check if character died from traps
         if not self.character.is_alive():
@@ -90,7 +139,9 @@ class GameEngine:
                 'trap_messages': trap_messages
             }
             
-        # Collect treasure
+        # Collect treasure (clearing it changes the node)
+        if self.current_node.treasure:
+            self.current_node = self.adventure.own_node(self.current_node.node_id)
         treasure_messages = self.current_node.collect_treasure(self.character)
         
         # Check for combat
@@ -151,7 +202,17 @@ class GameEngine:
         Returns:
             Combat instance
         """
-        return self.current_node.create_combat(self.character, self.adventure)
+        return self.current_node.create_combat(self.character, self.adventure, self.rng)
+        
+    def get_encounter_odds(self):
+        """
+        Get the odds of the fight at the current node.
+        
+        Returns:
+            Dictionary with victory/defeat probabilities, expected rounds
+            and 'exact' (False when the odds are estimated by simulation)
+        """
+        return self.current_node.encounter_odds(self.character, self.adventure)
         
     def handle_combat_result(self, combat_result):
         """
@@ -170,8 +231,10 @@ class GameEngine:
             messages = ['\n=== VICTORY! ===']
             
             if rewards.get('experience', 0) > 0:
-                self.character.gain_experience(rewards['experience'])
+                levels = self.character.gain_experience(rewards['experience'])
                 messages.append(f"Gained {rewards['experience']} XP!")
+                if levels:
+                    messages.append(f"You reached level {self.character.level}!")
                 
             if rewards.get('gold', 0) > 0:
                 messages.append(f"Found {rewards['gold']} gold pieces!")
@@ -180,6 +243,7 @@ class GameEngine:
                 messages.append(f"Found: {item}")
                 
             # Clear monsters from node
+            self.current_node = self.adventure.own_node(self.current_node.node_id)
             self.current_node.monsters = []
             
             return {
@@ -253,12 +317,12 @@ class GameEngine:
             with open(filename, 'r') as f:
                 save_data = json.load(f)
                 
-            # Restore character
+            # Restore character. Class, level and abilities go first so the
+            # derived stats are recomputed once; the saved HP then overrides them.
+            self.character.effects.clear()
             self.character.name = save_data['character_name']
             self.character.char_class = save_data['character_class']
             self.character.level = save_data['level']
-            self.character.current_hp = save_data['current_hp']
-            self.character.max_hp = save_data['max_hp']
             
             # Restore abilities
             abilities = save_data['abilities']
@@ -270,6 +334,8 @@ class GameEngine:
                 abilities['wisdom'],
                 abilities['charisma']
             )
+            self.character.max_hp = save_data['max_hp']
+            self.character.current_hp = save_data['current_hp']
             
             # Restore position
             self.current_node = self.adventure.get_node(save_data['current_node'])
@@ -0,0 +1,141 @@
+"""
+Character inventory as a multiset of item stacks keyed by name
+"""
+
+
+def item_key(item):
+    """
+    Normalized stack key for an item.
+    
+    Args:
+        item: Item object (anything with a name) or item name string
+    
+    Returns:
+        Lowercase item name
+    """
+    name = item.name if hasattr(item, 'name') else item
+    return name.lower()
+
+
+class Inventory:
+    """
+    Items grouped into stacks by case-insensitive name.
+    
+    Counting, adding and removing are O(1) per item: each item name is
+    normalized once when it is added, and each stack is a list of the
+    items (string names or Item objects) with that name. Iteration yields
+    the items stack by stack, in the order each name was first added, so
+    code that treats the inventory as a list keeps working.
+    """
+    
+    __slots__ = ('_stacks', '_size')
+    
+    def __init__(self, items=()):
+        """
+        Create an inventory.
+        
+        Args:
+            items: Initial items (Item objects or name strings)
+        """
+        self._stacks = {}
+        self._size = 0
+        for item in items:
+            self.add(item)
+    
+    def add(self, item, quantity=1):
+        """Add quantity copies of an item"""
+        key = item_key(item)
+        stack = self._stacks.get(key)
+        if stack is None:
+            stack = self._stacks[key] = []
+        stack.extend([item] * quantity)
+        self._size += quantity
+    
+    def count(self, name):
+        """Number of items with the given name (case-insensitive)"""
+        stack = self._stacks.get(item_key(name))
+        return len(stack) if stack else 0
+    
+    def get(self, name):
+        """
+        Get the item that would be used or removed next.
+        
+        Returns:
+            Item with the given name, or None if there is none
+        """
+        stack = self._stacks.get(item_key(name))
+        return stack[-1] if stack else None
+    
+    def remove(self, name, quantity=1):
+        """
+        Remove items by name.
+        
+        Args:
+            name: Item name (case-insensitive) or an item with that name
+            quantity: Number of items to remove
+        
+        Returns:
+            True if they were removed, False (and nothing removed) if there
+            are fewer than quantity
+        """
+        if quantity <= 0:
+            return True
+        key = item_key(name)
+        stack = self._stacks.get(key)
+        if not stack or len(stack) < quantity:
+            return False
+        del stack[-quantity:]
+        if not stack:
+            del self._stacks[key]
+        self._size -= quantity
+        return True
+    
+    def stacks(self):
+        """
+        Get the stacks.
+        
+        Returns:
+            List of (representative item, quantity) tuples
+        """
+        return [(stack[0], len(stack)) for stack in self._stacks.values()]
+    
+    def copy(self):
+        """Shallow copy (the items themselves are shared)"""
+        copy = Inventory()
+        copy._stacks = {key: list(stack) for key, stack in self._stacks.items()}
+        copy._size = self._size
+        return copy
+    
+    def clear(self):
+        """Remove every item"""
+        self._stacks.clear()
+        self._size = 0
+    
+    # List compatibility
+    append = add
+    
+    def __contains__(self, item):
+        return item_key(item) in self._stacks
+    
+    def __iter__(self):
+        for stack in self._stacks.values():
+            yield from stack
+    
+    def __getitem__(self, index):
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("inventory index out of range")
+        for stack in self._stacks.values():
+            if index < len(stack):
+                return stack[index]
+            index -= len(stack)
+    
+    def __len__(self):
+        return self._size
+    
+    def __bool__(self):
+        return self._size > 0
+    
+    def __repr__(self):
+        return f"Inventory({list(self)!r})"
@@ -128,6 +128,11 @@ def play_adventure(game_engine):
             print("COMBAT BEGINS!".center(60))
             print("!"*60)
             
+            odds = game_engine.get_encounter_odds()
+            estimate = "" if odds['exact'] else "estimated, "
+            print(f"Chance of victory: {odds['victory']:.0%} "
+                  f"({estimate}about {odds['expected_rounds']:.1f} rounds)")
+            
             combat = game_engine.start_combat()
             combat_result = {'status': 'ongoing'}
             
@@ -0,0 +1,281 @@
+"""
+Struct-of-arrays monster storage for mass battles (requires NumPy)
+"""
+from collections import Counter
+
+import dice
+from dice import np
+from monster import Monster
+
+# Encounters with more monsters than this use a MonsterTable when NumPy is available
+MASS_BATTLE_THRESHOLD = 50
+
+
+def use_mass_battle(monster_count):
+    """Check whether an encounter of this size should use a MonsterTable"""
+    return dice.NUMPY_ENABLED and monster_count > MASS_BATTLE_THRESHOLD
+
+
+class MonsterTable:
+    """
+    Columns of monster stats for encounters with hundreds of monsters.
+    
+    Each row is one monster. Per-row columns hold HP, AC, attack bonus,
+    initiative and an index into a shared list of damage expressions;
+    everything else (name, treasure, saves) comes from a shared prototype
+    Monster for that row's kind. Iterating or indexing the table yields
+    lightweight HordeMember views, so code written for a list of Monster
+    objects keeps working.
+    """
+    
+    def __init__(self, prototypes, kinds, max_hp=None, current_hp=None, rng=None):
+        """
+        Build a table.
+        
+        Args:
+            prototypes: List of Monster instances, one per kind of monster
+            kinds: Prototype index for each row
+            max_hp: Max HP per row (default: rolled from each prototype's hit dice)
+            current_hp: Current HP per row (default: max_hp)
+            rng: RNGStream for the monsters' rolls (default: global generators)
+        """
+        dice._require_numpy()
+        self.prototypes = prototypes
+        self.rng = rng
+        self.kind = np.asarray(kinds, dtype=np.int32)
+        
+        self.armor_class = np.array([p.armor_class for p in prototypes], dtype=np.int64)[self.kind]
+        self.attack_bonus = np.array([p.attack_bonus for p in prototypes], dtype=np.int64)[self.kind]
+        
+        # Prototypes that share a damage string share one expression slot
+        self.damage_exprs = []
+        slots = {}
+        for prototype in prototypes:
+            expr = dice.parse(prototype.damage)
+            if expr not in slots:
+                slots[expr] = len(self.damage_exprs)
+                self.damage_exprs.append(expr)
+        self.damage_index = np.array([slots[dice.parse(p.damage)] for p in prototypes], dtype=np.int32)[self.kind]
+        
+        if max_hp is None:
+            max_hp = np.empty(len(self.kind), dtype=np.int64)
+            for k, prototype in enumerate(prototypes):
+                rows = np.flatnonzero(self.kind == k)
+                max_hp[rows] = np.maximum(1, dice.roll_expr_many(prototype.hit_dice, rows.size, rng))
+        self.max_hp = np.asarray(max_hp, dtype=np.int64)
+        self.current_hp = self.max_hp.copy() if current_hp is None else np.asarray(current_hp, dtype=np.int64)
+        self.initiative = np.zeros(len(self.kind), dtype=np.int64)
+    
+    @classmethod
+    def from_monsters(cls, monsters, rng=None):
+        """
+        Build a table from existing Monster objects, keeping their HP.
+        
+        Monsters with identical stats share one prototype.
+        """
+        prototypes = []
+        keys = {}
+        kinds = []
+        for monster in monsters:
+            key = (type(monster), monster.name, monster.hit_dice, monster.armor_class,
+                   monster.attack_bonus, monster.damage, monster.fortitude_save,
+                   monster.reflex_save, monster.will_save)
+            if key not in keys:
+                keys[key] = len(prototypes)
+                prototypes.append(monster)
+            kinds.append(keys[key])
+        return cls(prototypes, kinds,
+                   [m.max_hp for m in monsters], [m.current_hp for m in monsters],
+                   rng if rng is not None else monsters[0].rng)
+    
+    def __len__(self):
+        return len(self.kind)
+    
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self.kind)
+        if not 0 <= index < len(self.kind):
+            raise IndexError("monster index out of range")
+        return HordeMember(self, index)
+    
+    def __iter__(self):
+        for index in range(len(self.kind)):
+            yield HordeMember(self, index)
+    
+    def alive_rows(self):
+        """Row indices of living monsters"""
+        return np.flatnonzero(self.current_hp > 0)
+    
+    def alive_members(self):
+        """Living monsters as HordeMember views"""
+        return [HordeMember(self, int(index)) for index in self.alive_rows()]
+    
+    def roll_initiative(self):
+        """Roll initiative for every row in one draw"""
+        self.initiative = dice._np_generator(self.rng).integers(1, 21, size=len(self.kind))
+    
+    def attack(self, rows, target_ac):
+        """
+        Resolve one attack per row against a single target.
+        
+        Args:
+            rows: Array of row indices that attack
+            target_ac: Target's Armor Class
+        
+        Returns:
+            Tuple of (hits: bool array, damage: int array), aligned with rows
+        """
+        generator = dice._np_generator(self.rng)
+        hits = generator.integers(1, 21, size=rows.size) + self.attack_bonus[rows] >= target_ac
+        damage = np.zeros(rows.size, dtype=np.int64)
+        slots = self.damage_index[rows]
+        for slot, expr in enumerate(self.damage_exprs):
+            selected = np.flatnonzero(hits & (slots == slot))
+            if selected.size:
+                damage[selected] = np.maximum(1, dice.roll_expr_many(expr, selected.size, self.rng))
+        return hits, damage
+    
+    def attack_by_kind(self, rows, target_ac):
+        """
+        Resolve attacks for rows and total the results per monster kind.
+        
+        Returns:
+            Tuple of (total damage, list of (kind, name, attackers, hits, damage))
+        """
+        hits, damage = self.attack(rows, target_ac)
+        kinds = self.kind[rows]
+        size = len(self.prototypes)
+        attackers = np.bincount(kinds, minlength=size)
+        hit_counts = np.bincount(kinds[hits], minlength=size)
+        damage_totals = np.bincount(kinds, weights=damage, minlength=size)
+        by_kind = [(k, p.name, int(attackers[k]), int(hit_counts[k]), int(damage_totals[k]))
+                   for k, p in enumerate(self.prototypes) if attackers[k]]
+        return int(damage.sum()), by_kind
+    
+    def area_damage(self, damage, save_type, dc, rng=None):
+        """
+        Hit every living row with an area effect; each row saves for half.
+        
+        Args:
+            damage: Damage rolled for the effect
+            save_type: 'fortitude', 'reflex' or 'will'
+            dc: Save DC
+            rng: RNGStream for the saves (default: the table's)
+        
+        Returns:
+            Tuple of (rows hit, saves made, Counter of name -> monsters slain)
+        """
+        rows = self.alive_rows()
+        bonus = np.array([getattr(p, save_type + '_save') for p in self.prototypes],
+                         dtype=np.int64)[self.kind[rows]]
+        saved = dice.d20_many(rows.size, bonus, self.rng if rng is None else rng) >= dc
+        self.current_hp[rows] -= np.where(saved, damage // 2, damage)
+        
+        dead = rows[self.current_hp[rows] <= 0]
+        counts = np.bincount(self.kind[dead], minlength=len(self.prototypes))
+        slain = Counter()
+        for k, prototype in enumerate(self.prototypes):
+            if counts[k]:
+                slain[prototype.name] += int(counts[k])
+        return int(rows.size), int(saved.sum()), slain
+    
+    def summary(self):
+        """
+        Summarize living monsters by kind.
+        
+        Returns:
+            List of (name, alive count, total current HP) tuples
+        """
+        alive = self.current_hp > 0
+        counts = np.bincount(self.kind[alive], minlength=len(self.prototypes))
+        hp = np.bincount(self.kind[alive], weights=self.current_hp[alive], minlength=len(self.prototypes))
+        return [(p.name, int(counts[k]), int(hp[k]))
+                for k, p in enumerate(self.prototypes) if counts[k]]
+
+
+class HordeMember:
+    """
+    View of one MonsterTable row with the Monster interface.
+    
+    Stats that vary per row read and write the table's columns; the rest
+    comes from the row's prototype.
+    """
+    
+    __slots__ = ('table', 'index')
+    
+    def __init__(self, table, index):
+        self.table = table
+        self.index = index
+    
+    @property
+    def _prototype(self):
+        return self.table.prototypes[self.table.kind[self.index]]
+    
+    @property
+    def current_hp(self):
+        return int(self.table.current_hp[self.index])
+    
+    @current_hp.setter
+    def current_hp(self, value):
+        self.table.current_hp[self.index] = value
+    
+    @property
+    def max_hp(self):
+        return int(self.table.max_hp[self.index])
+    
+    @max_hp.setter
+    def max_hp(self, value):
+        self.table.max_hp[self.index] = value
+    
+    @property
+    def armor_class(self):
+        return int(self.table.armor_class[self.index])
+    
+    @armor_class.setter
+    def armor_class(self, value):
+        self.table.armor_class[self.index] = value
+    
+    @property
+    def kind(self):
+        """Prototype index of this row"""
+        return int(self.table.kind[self.index])
+    
+    @property
+    def attack_bonus(self):
+        return int(self.table.attack_bonus[self.index])
+    
+    @property
+    def rng(self):
+        return self.table.rng
+    
+    @rng.setter
+    def rng(self, value):
+        self.table.rng = value
+    
+    name = property(lambda self: self._prototype.name)
+    hit_dice = property(lambda self: self._prototype.hit_dice)
+    damage = property(lambda self: self._prototype.damage)
+    special_abilities = property(lambda self: self._prototype.special_abilities)
+    treasure = property(lambda self: self._prototype.treasure)
+    fortitude_save = property(lambda self: self._prototype.fortitude_save)
+    reflex_save = property(lambda self: self._prototype.reflex_save)
+    will_save = property(lambda self: self._prototype.will_save)
+    
+    # Rules are shared with Monster
+    attack = Monster.attack
+    attack_roll = Monster.attack_roll
+    _roll_damage = Monster._roll_damage
+    _roll_hit_points = Monster._roll_hit_points
+    reroll_hit_points = Monster.reroll_hit_points
+    damage_distribution = Monster.damage_distribution
+    take_damage = Monster.take_damage
+    heal = Monster.heal
+    is_alive = Monster.is_alive
+    saving_throw = Monster.saving_throw
+    __str__ = Monster.__str__
+    
+    def __eq__(self, other):
+        return isinstance(other, HordeMember) and other.table is self.table and other.index == self.index
+    
+    def __hash__(self):
+        return hash((id(self.table), self.index))
@@ -1,6 +1,9 @@
 """
 Monster and enemy classes for D20 combat
 """
+from collections import OrderedDict
+
+import abilities
 import dice
 
 
@@ -9,9 +12,15 @@ class Monster:
     Generic monster/enemy following D20 rules
     """
     
+    __slots__ = (
+        'name', 'hit_dice', 'armor_class', 'attack_bonus', 'damage',
+        'special_abilities', 'treasure', 'rng', 'max_hp', 'current_hp',
+        'fortitude_save', 'reflex_save', 'will_save',
+    )
+    
     def __init__(self, name, hit_dice="1d8", armor_class=10, 
                  attack_bonus=0, damage="1d6", 
-                 special_abilities=None, treasure=None):
+                 special_abilities=None, treasure=None, rng=None):
         self.name = name
         self.hit_dice = hit_dice
         self.armor_class = armor_class
@@ -19,6 +28,10 @@ class Monster:
         self.damage = damage
         self.special_abilities = special_abilities or []
         self.treasure = treasure or []
+        self.rng = rng  # Random stream (None = global generator)
+        
+        # Validate damage dice up front (parsed expressions are cached)
+        dice.parse(damage)
         
         # Calculate HP from hit dice
         self.max_hp = self._roll_hit_points()
@@ -30,27 +43,8 @@ class Monster:
         self.will_save = 0
         
     def _roll_hit_points(self):
-        """Roll hit points based on hit dice"""
-        if 'd' in self.hit_dice:
-            count, sides = self.hit_dice.split('d')
-            count = int(count)
-            sides = int(sides.split('+')[0].split('-')[0])  # Handle modifiers
-            
-            hp = 0
-            for _ in range(count):
-                hp += dice.roll(sides)
-                
-            # Add any flat modifier
-            if '+' in self.hit_dice:
-                modifier = int(self.hit_dice.split('+')[1])
-                hp += modifier
-            elif '-' in self.hit_dice:
-                modifier = int(self.hit_dice.split('-')[1])
-                hp -= modifier
-                
-            return max(1, hp)
-        else:
-            return int(self.hit_dice)
+        """Roll hit points based on hit dice (one draw from an alias table)"""
+        return max(1, dice.sampler(self.hit_dice).sample(self.rng))
             
     def attack(self, target):
         """
@@ -62,33 +56,52 @@ class Monster:
         Returns:
             Tuple of (hit: bool, damage: int, message: str)
         """
-        attack_roll = dice.d20(1, self.attack_bonus)
+        hit, damage_dealt = self.attack_roll(target.armor_class)
         
-        if attack_roll >= target.armor_class:
-            # Hit!
-            damage_dealt = self._roll_damage()
+        if hit:
             target.take_damage(damage_dealt)
             return True, damage_dealt, f"{self.name} hits {target.name} for {damage_dealt} damage!"
         else:
             return False, 0, f"{self.name} misses {target.name}!"
             
-    def _roll_damage(self):
-        """Roll damage dice"""
-        if '+' in self.damage:
-            dice_part, mod = self.damage.split('+')
-            mod = int(mod)
-        elif '-' in self.damage:
-            dice_part, mod = self.damage.split('-')
-            mod = -int(mod)
+    def attack_roll(self, target_ac):
+        """
+        Roll an attack and damage without applying it.
+        
+        Args:
+            target_ac: Target's Armor Class
+            
+        Returns:
+            Tuple of (hit: bool, damage: int)
+        """
+        attack_roll = dice.d20(1, self.attack_bonus, self.rng)
+        
+        if attack_roll >= target_ac:
+            return True, self._roll_damage()
         else:
-            dice_part = self.damage
-            mod = 0
+            return False, 0
             
-        count, sides = dice_part.split('d')
-        count = int(count)
-        sides = int(sides)
+    def _roll_damage(self):
+        """Roll damage dice"""
+        return max(1, dice.parse(self.damage).roll(self.rng))
         
-        return max(1, dice.roll(sides, count, mod))
+    def damage_distribution(self):
+        """
+        Exact distribution of this monster's damage on a hit.
+        
+        Returns:
+            dice.Distribution (minimum 1, matching _roll_damage)
+        """
+        return dice.distribution(self.damage).clamp(1)
+        
+    def heal(self, amount):
+        """Heal damage, capped at max HP"""
+        self.current_hp = min(self.current_hp + amount, self.max_hp)
+        
+    def reroll_hit_points(self):
+        """Re-roll hit points and heal to the new maximum"""
+        self.max_hp = self._roll_hit_points()
+        self.current_hp = self.max_hp
         
     def take_damage(self, damage):
         """Take damage and return True if still alive"""
@@ -102,50 +115,334 @@ class Monster:
     def saving_throw(self, save_type):
         """Make a saving throw"""
         if save_type == 'fortitude':
-            return dice.d20(1, self.fortitude_save)
+            return dice.d20(1, self.fortitude_save, self.rng)
         elif save_type == 'reflex':
-            return dice.d20(1, self.reflex_save)
+            return dice.d20(1, self.reflex_save, self.rng)
         elif save_type == 'will':
-            return dice.d20(1, self.will_save)
+            return dice.d20(1, self.will_save, self.rng)
         else:
-            return dice.d20()
+            return dice.d20(rng=self.rng)
             
     def __str__(self):
         return f"{self.name} (AC {self.armor_class}, HP {self.current_hp}/{self.max_hp})"
 
 
+# Nodes with at least this many copies of one monster type fight them as a Swarm
+SWARM_SIZE = 4
+
+# Swarm damage totals use an exact distribution up to this many hits; beyond
+# it each hit is rolled, since building the distribution grows much faster
+SWARM_EXACT_HITS = 16
+
+# Distributions kept by the Swarm caches, least recently used dropped first
+SWARM_CACHE_SIZE = 256
+
+
+class Swarm:
+    """
+    A group of identical monsters fighting as one combatant.
+    
+    Members share the prototype's stats and keep their own HP in a pooled
+    list; the player's attacks land on the front member. Each round the
+    swarm draws the number of hits from a binomial distribution and, for
+    up to SWARM_EXACT_HITS hits, the total damage from the exact
+    distribution of that many damage rolls; larger totals roll each hit.
+    
+    Special abilities act per member (every hit can poison, every member
+    breathes on its own recharge), so monsters with executable abilities
+    can't be swarmed; they fight individually or in a MonsterTable.
+    """
+    
+    # Exact distributions shared by all swarms (LRU, SWARM_CACHE_SIZE each)
+    _hit_counts = OrderedDict()      # (members, hitting d20 faces) -> Distribution
+    _damage_totals = OrderedDict()   # (damage dice, hits) -> Distribution
+    
+    def __init__(self, prototype, count, rng=None):
+        """
+        Create a swarm.
+        
+        Args:
+            prototype: Monster whose stats every member shares (becomes the
+                       first member, keeping its rolled HP)
+            count: Number of members
+            rng: RNGStream for the swarm's rolls (default: the prototype's)
+            
+        Raises:
+            ValueError: If the prototype has executable special abilities
+        """
+        if abilities.compile_abilities(prototype.special_abilities):
+            raise ValueError(f"{prototype.name} has special abilities and can't fight as a swarm")
+        self.prototype = prototype
+        self.count = count
+        self.rng = prototype.rng if rng is None else rng
+        self.member_hp = [prototype.current_hp] + [self._roll_hit_points() for _ in range(count - 1)]
+        self.member_max_hp = list(self.member_hp)
+        self.max_hp = sum(self.member_hp)
+        
+    @property
+    def name(self):
+        return f"{self.prototype.name} swarm ({len(self.member_hp)})"
+        
+    @property
+    def current_hp(self):
+        """Total HP of living members"""
+        return sum(self.member_hp)
+        
+    hit_dice = property(lambda self: self.prototype.hit_dice)
+    armor_class = property(lambda self: self.prototype.armor_class)
+    attack_bonus = property(lambda self: self.prototype.attack_bonus)
+    damage = property(lambda self: self.prototype.damage)
+    special_abilities = property(lambda self: self.prototype.special_abilities)
+    treasure = property(lambda self: self.prototype.treasure)
+    fortitude_save = property(lambda self: self.prototype.fortitude_save)
+    reflex_save = property(lambda self: self.prototype.reflex_save)
+    will_save = property(lambda self: self.prototype.will_save)
+    
+    def members(self):
+        """The prototype once per member, living or dead (for rewards)"""
+        return [self.prototype] * self.count
+        
+    def attack(self, target):
+        """
+        Attack a target character with every living member.
+        
+        Returns:
+            Tuple of (hit: bool, damage: int, message: str)
+        """
+        hits, damage_dealt = self._roll_attacks(target.armor_class)
+        
+        if hits:
+            target.take_damage(damage_dealt)
+        return hits > 0, damage_dealt, (f"{self.name} attacks {target.name}: {hits} of "
+                                        f"{len(self.member_hp)} hit for {damage_dealt} damage!")
+        
+    def attack_roll(self, target_ac):
+        """
+        Roll all members' attacks and their total damage without applying it.
+        
+        Returns:
+            Tuple of (hit: bool, damage: int) where hit means at least one member hit
+        """
+        hits, damage = self._roll_attacks(target_ac)
+        return hits > 0, damage
+        
+    def _roll_attacks(self, target_ac):
+        """Draw the number of hits, then the total damage of that many hits"""
+        faces = 21 - (target_ac - self.attack_bonus)
+        members = len(self.member_hp)
+        hits = _cached(Swarm._hit_counts, (members, faces),
+                       lambda: dice.binomial(members, faces)).sample(self.rng)
+        if not hits:
+            return 0, 0
+            
+        if hits > SWARM_EXACT_HITS:
+            damage = dice.parse(self.damage)
+            if dice.NUMPY_ENABLED:
+                return hits, int(dice.np.maximum(1, dice.roll_expr_many(damage, hits, self.rng)).sum())
+            return hits, sum(max(1, damage.roll(self.rng)) for _ in range(hits))
+        totals = _cached(Swarm._damage_totals, (self.damage, hits),
+                         lambda: self.prototype.damage_distribution().repeat(hits))
+        return hits, totals.sample(self.rng)
+        
+    def reroll_hit_points(self):
+        """Bring every member back with freshly rolled hit points"""
+        self.member_hp = [self._roll_hit_points() for _ in range(self.count)]
+        self.member_max_hp = list(self.member_hp)
+        self.max_hp = sum(self.member_hp)
+        
+    def take_damage(self, damage):
+        """Damage the front member and return True if any member is still alive"""
+        if self.member_hp:
+            self.member_hp[0] -= damage
+            if self.member_hp[0] <= 0:
+                self.member_hp.pop(0)
+                self.member_max_hp.pop(0)
+        return self.is_alive()
+        
+    def area_damage(self, damage, save_type, dc, rng=None):
+        """
+        Hit every living member with an area effect; each saves for half.
+        
+        Args:
+            damage: Damage rolled for the effect
+            save_type: 'fortitude', 'reflex' or 'will'
+            dc: Save DC
+            rng: RNGStream for the saves (default: the swarm's)
+            
+        Returns:
+            Tuple of (members hit, saves made, {name: members slain})
+        """
+        rng = self.rng if rng is None else rng
+        bonus = getattr(self.prototype, save_type + '_save')
+        hit = len(self.member_hp)
+        saved = 0
+        member_hp, member_max_hp = [], []
+        for hp, max_hp in zip(self.member_hp, self.member_max_hp):
+            if dice.d20(1, bonus, rng) >= dc:
+                saved += 1
+                hp -= damage // 2
+            else:
+                hp -= damage
+            if hp > 0:
+                member_hp.append(hp)
+                member_max_hp.append(max_hp)
+        self.member_hp = member_hp
+        self.member_max_hp = member_max_hp
+        slain = hit - len(member_hp)
+        return hit, saved, {self.prototype.name: slain} if slain else {}
+        
+    def heal(self, amount):
+        """Heal every living member, each capped at its own max HP"""
+        self.member_hp = [min(hp + amount, max_hp)
+                          for hp, max_hp in zip(self.member_hp, self.member_max_hp)]
+        
+    def is_alive(self):
+        """Check if any member is still alive"""
+        return bool(self.member_hp)
+        
+    # Rolls are shared with Monster
+    _roll_hit_points = Monster._roll_hit_points
+    damage_distribution = Monster.damage_distribution
+    saving_throw = Monster.saving_throw
+    __str__ = Monster.__str__
+
+
+def _cached(cache, key, build):
+    """Look up key in an LRU cache of SWARM_CACHE_SIZE entries, building it on a miss"""
+    value = cache.get(key)
+    if value is None:
+        value = cache[key] = build()
+        if len(cache) > SWARM_CACHE_SIZE:
+            cache.popitem(last=False)
+    else:
+        cache.move_to_end(key)
+    return value
+
+
+class MonsterTemplate:
+    """
+    Validated, pre-parsed monster stats that stamp out instances cheaply.
+    
+    Spawning copies the stored attributes onto a new instance of the
+    monster class and rolls hit points; nothing is parsed or looked up.
+    List stats (treasure, special abilities) are shared between instances
+    and treated as read-only.
+    """
+    
+    def __init__(self, monster_class, fields):
+        """
+        Create a template.
+        
+        Args:
+            monster_class: Monster or a predefined subclass
+            fields: Attribute values for each instance, excluding rng and HP
+            
+        Raises:
+            ValueError: If hit_dice or damage is not valid dice notation
+        """
+        self.monster_class = monster_class
+        self.fields = fields
+        self.hit_dice = dice.parse(fields['hit_dice'])
+        self.damage = dice.parse(fields['damage'])
+        
+    @property
+    def name(self):
+        return self.fields['name']
+        
+    @classmethod
+    def from_stats(cls, name, stats, monster_class=None):
+        """
+        Compile a stat block (custom monster or bestiary entry).
+        
+        Args:
+            name: Monster name
+            stats: Stat dictionary as stored in adventure JSON
+            monster_class: Class to instantiate (default: Monster)
+        
+        Raises:
+            ValueError: If hit_dice or damage is not valid dice notation
+        """
+        return cls(monster_class or Monster, {
+            'name': name,
+            'hit_dice': stats.get('hit_dice', '2d8'),
+            'armor_class': stats.get('armor_class', 12),
+            'attack_bonus': stats.get('attack_bonus', 2),
+            'damage': stats.get('damage', '1d6'),
+            'special_abilities': stats.get('special_abilities', []),
+            'treasure': stats.get('treasure', []),
+            'fortitude_save': stats.get('fortitude_save', 0),
+            'reflex_save': stats.get('reflex_save', 0),
+            'will_save': stats.get('will_save', 0),
+        })
+        
+    @classmethod
+    def from_class(cls, monster_class):
+        """Compile a predefined monster class"""
+        # Build one instance on a throwaway stream just to read its stats
+        prototype = monster_class(rng=dice.RNGStream(0))
+        fields = {key: getattr(prototype, key) for key in Monster.__slots__
+                  if key not in ('rng', 'max_hp', 'current_hp')}
+        return cls(monster_class, fields)
+        
+    def spawn(self, rng=None):
+        """
+        Create a monster with freshly rolled hit points.
+        
+        Args:
+            rng: RNGStream for the monster's rolls (default: global generator)
+            
+        Returns:
+            Monster instance
+        """
+        monster = self.monster_class.__new__(self.monster_class)
+        for key, value in self.fields.items():
+            setattr(monster, key, value)
+        monster.rng = rng
+        monster.max_hp = max(1, dice.sampler(self.hit_dice).sample(rng))
+        monster.current_hp = monster.max_hp
+        return monster
+
+
 # Predefined monsters
 class Goblin(Monster):
     """Weak humanoid enemy"""
-    def __init__(self):
+    __slots__ = ()
+    
+    def __init__(self, rng=None):
         super().__init__(
             name="Goblin",
             hit_dice="2d6",
             armor_class=12,
             attack_bonus=0,
             damage="1d4+2",
-            treasure=["10 gold pieces"]
+            treasure=["10 gold pieces"],
+            rng=rng
         )
         self.reflex_save = 3
 
 
 class Orc(Monster):
     """Medium humanoid warrior"""
-    def __init__(self):
+    __slots__ = ()
+    
+    def __init__(self, rng=None):
         super().__init__(
             name="Orc",
             hit_dice="2d8",
             armor_class=13,
             attack_bonus=1,
             damage="1d8",
-            treasure=["20 gold pieces", "Battle axe"]
+            treasure=["20 gold pieces", "Battle axe"],
+            rng=rng
         )
         self.fortitude_save = 3
 
 
 class Skeleton(Monster):
     """Undead warrior"""
-    def __init__(self):
+    __slots__ = ()
+    
+    def __init__(self, rng=None):
         super().__init__(
             name="Skeleton",
             hit_dice="1d12",
@@ -153,28 +450,34 @@ class Skeleton(Monster):
             attack_bonus=2,
             damage="1d6+1",
             special_abilities=["Undead: immune to mind-affecting"],
-            treasure=[]
+            treasure=[],
+            rng=rng
         )
         self.will_save = -2
 
 
 class Ogre(Monster):
     """Large giant enemy"""
-    def __init__(self):
+    __slots__ = ()
+    
+    def __init__(self, rng=None):
         super().__init__(
             name="Ogre",
             hit_dice="4d8+8",
             armor_class=16,
             attack_bonus=8,
             damage="2d8+7",
-            treasure=["50 gold pieces", "Large club"]
+            treasure=["50 gold pieces", "Large club"],
+            rng=rng
         )
         self.fortitude_save = 5
 
 
 class Dragon(Monster):
     """Powerful dragon boss"""
-    def __init__(self):
+    __slots__ = ()
+    
+    def __init__(self, rng=None):
         super().__init__(
             name="Young Red Dragon",
             hit_dice="13d12+39",
@@ -182,7 +485,8 @@ class Dragon(Monster):
             attack_bonus=18,
             damage="2d6+7",
             special_abilities=["Breath Weapon: 8d10 fire damage, Reflex DC 19 for half"],
-            treasure=["500 gold pieces", "Magic sword +1", "Ruby worth 1000gp"]
+            treasure=["500 gold pieces", "Magic sword +1", "Ruby worth 1000gp"],
+            rng=rng
         )
         self.fortitude_save = 11
         self.reflex_save = 8
@@ -190,7 +494,7 @@ class Dragon(Monster):
         
     def breath_weapon(self, target):
         """Dragon's breath weapon attack"""
-        damage = dice.d10(8)
+        damage = dice.d10(8, rng=self.rng)
         save_roll = target.saving_throw('reflex')
         
         if save_roll >= 19:
@@ -205,7 +509,9 @@ class Dragon(Monster):
 
 class GiantSpider(Monster):
     """Venomous spider"""
-    def __init__(self):
+    __slots__ = ()
+    
+    def __init__(self, rng=None):
         super().__init__(
             name="Giant Spider",
             hit_dice="2d8",
@@ -213,14 +519,17 @@ class GiantSpider(Monster):
             attack_bonus=4,
             damage="1d6",
             special_abilities=["Poison: DC 14 Fort save or 1d4 STR damage"],
-            treasure=[]
+            treasure=[],
+            rng=rng
         )
         self.reflex_save = 4
 
 
 class Zombie(Monster):
     """Slow undead creature"""
-    def __init__(self):
+    __slots__ = ()
+    
+    def __init__(self, rng=None):
         super().__init__(
             name="Zombie",
             hit_dice="2d12+3",
@@ -228,7 +537,8 @@ class Zombie(Monster):
             attack_bonus=2,
             damage="1d6+1",
             special_abilities=["Undead: immune to mind-affecting"],
-            treasure=[]
+            treasure=[],
+            rng=rng
         )
         self.fortitude_save = 3
         self.will_save = -2
@@ -236,7 +546,9 @@ class Zombie(Monster):
 
 class Troll(Monster):
     """Regenerating monster"""
-    def __init__(self):
+    __slots__ = ()
+    
+    def __init__(self, rng=None):
         super().__init__(
             name="Troll",
             hit_dice="6d8+36",
@@ -244,7 +556,8 @@ class Troll(Monster):
             attack_bonus=9,
             damage="1d6+6",
             special_abilities=["Regeneration 5: heals 5 HP per round"],
-            treasure=["30 gold pieces"]
+            treasure=["30 gold pieces"],
+            rng=rng
         )
         self.fortitude_save = 9
 
@@ -262,19 +575,52 @@ MONSTER_TYPES = {
 }
 
 
-def create_monster(monster_type):
+def create_monster(monster_type, rng=None):
     """
     Create a monster by type name.
     
     Args:
         monster_type: String name of monster type
+        rng: RNGStream for the monster's rolls (default: global generator)
         
     Returns:
         Monster instance
     """
-    monster_class = MONSTER_TYPES.get(monster_type.lower())
-    if monster_class:
-        return monster_class()
+    template = get_template(monster_type)
+    if template:
+        return template.spawn(rng)
     else:
         # Default generic monster
-        return Monster(name="Unknown Creature", hit_dice="2d8", armor_class=12)
+        return Monster(name="Unknown Creature", hit_dice="2d8", armor_class=12, rng=rng)
+
+
+# Compiled predefined classes missing from the bestiary, keyed by lowercase type name
+_TEMPLATES = {}
+
+
+def get_template(monster_type):
+    """
+    Get the compiled template for a monster type.
+    
+    Names resolve through the shared bestiary first, then the predefined
+    monster classes (whose stats live only in their classes).
+    
+    Args:
+        monster_type: String name of monster type (case-insensitive)
+        
+    Returns:
+        MonsterTemplate, or None if the type is unknown
+    """
+    from bestiary import default_bestiary
+    template = default_bestiary().get_template(monster_type)
+    if template is not None:
+        return template
+        
+    key = monster_type.lower()
+    template = _TEMPLATES.get(key)
+    if template is None:
+        monster_class = MONSTER_TYPES.get(key)
+        if monster_class is None:
+            return None
+        template = _TEMPLATES[key] = MonsterTemplate.from_class(monster_class)
+    return template
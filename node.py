@@ -1,10 +1,18 @@
 """
 Node/Paragraph system for gamebook-style adventures
 """
+import copy
+from abilities import compile_abilities
 from combat import Combat, HealingPotion
-from monster import create_monster
+from collections import Counter
+from monster import SWARM_SIZE, MonsterTemplate, Swarm, create_monster, get_template
+from mass_battle import MonsterTable, use_mass_battle
+from odds import encounter_odds
 import dice
 
+# Simulated fights behind the odds of encounters that are not solved exactly
+ODDS_TRIALS = 500
+
 
 class GameNode:
     """
@@ -12,6 +20,10 @@ class GameNode:
     Each node has a description and can contain encounters, choices, etc.
     """
     
+    __slots__ = ('node_id', 'title', 'description', 'monsters', 'treasure', 'traps',
+                 'choices', 'is_victory', 'is_defeat', 'on_enter_events',
+                 'gold_cost', 'item_cost')
+    
     def __init__(self, node_id, title, description):
         """
         Initialize a game node.
@@ -75,7 +87,11 @@ class GameNode:
             dc: Difficulty Class to avoid
             damage: Damage dice string (e.g., "2d6")
             save_type: Type of saving throw to avoid
+            
+        Raises:
+            ValueError: If damage is not valid dice notation
         """
+        dice.parse(damage)  # Validate now rather than when the trap fires
         self.traps.append({
             'type': trap_type,
             'dc': dc,
@@ -188,8 +204,7 @@ class GameNode:
         # Check item requirements
         if 'item' in requirements:
             required_item = requirements['item']
-            has_item = any(item.name == required_item for item in character.inventory)
-            if not has_item:
+            if required_item not in character.inventory:
                 return False, f"Requires {required_item}"
                 
         # Check ability score requirements
@@ -207,16 +222,19 @@ class GameNode:
                 
         return True, ""
         
-    def trigger_traps(self, character):
+    def trigger_traps(self, character, rng=None):
         """
         Trigger any traps at this node.
         
         Args:
             character: Player character
+            rng: RNGStream for trap damage (default: the character's)
             
         Returns:
             List of trap result messages
         """
+        if rng is None:
+            rng = character.rng
         messages = []
         
         for trap in self.traps:
@@ -226,66 +244,113 @@ class GameNode:
                 messages.append(f"You avoid the {trap['type']}! (Save: {save_roll} vs DC {trap['dc']})")
             else:
                 # Take damage from trap
-                damage = self._roll_trap_damage(trap['damage'])
+                damage = self._roll_trap_damage(trap['damage'], rng)
                 character.take_damage(damage)
                 messages.append(f"You trigger a {trap['type']}! (Save: {save_roll} vs DC {trap['dc']})")
                 messages.append(f"You take {damage} damage! HP: {character.current_hp}/{character.max_hp}")
                 
         return messages
         
-    def _roll_trap_damage(self, damage_dice):
+    def _roll_trap_damage(self, damage_dice, rng=None):
         """Roll trap damage"""
-        if '+' in damage_dice:
-            dice_part, mod = damage_dice.split('+')
-            mod = int(mod)
-        else:
-            dice_part = damage_dice
-            mod = 0
-            
-        count, sides = dice_part.split('d')
-        count = int(count)
-        sides = int(sides)
-        
-        return dice.roll(sides, count, mod)
+        return dice.sampler(damage_dice).sample(rng)
         
     def has_combat(self):
         """Check if this node has combat encounters"""
         return len(self.monsters) > 0
         
-    def create_combat(self, character, adventure=None):
+    def create_combat(self, character, adventure=None, rng=None):
         """
         Create a combat encounter from this node's monsters.
         
         Args:
             character: Player character
             adventure: Adventure instance (optional, for custom monsters)
+            rng: RNGStream for the encounter (default: the character's)
             
         Returns:
             Combat instance
         """
-        from monster import Monster
+        if rng is None:
+            rng = character.rng
+            
+        # Large encounters share one prototype per monster type in a MonsterTable
+        if use_mass_battle(len(self.monsters)):
+            prototypes = []
+            kind_index = {}
+            for m_type in self.monsters:
+                if m_type not in kind_index:
+                    kind_index[m_type] = len(prototypes)
+                    prototypes.append(self._create_monster(m_type, adventure, rng))
+            kinds = [kind_index[m_type] for m_type in self.monsters]
+            return Combat(character, MonsterTable(prototypes, kinds, rng=rng), rng)
+            
+        # Many copies of one type fight as a single Swarm, unless their
+        # special abilities have to act per member
+        counts = Counter(self.monsters)
+        swarmed = set()
         monster_instances = []
-        
         for m_type in self.monsters:
-            # Check if it's a custom monster
-            if adventure and m_type in adventure.custom_monsters:
-                # Create custom monster
-                stats = adventure.custom_monsters[m_type]
-                monster = Monster(
-                    name=m_type,
-                    hit_dice=stats.get('hit_dice', '2d8'),
-                    armor_class=stats.get('armor_class', 12),
-                    attack_bonus=stats.get('attack_bonus', 2),
-                    damage=stats.get('damage', '1d6'),
-                    special_abilities=stats.get('special_abilities', []),
-                    treasure=stats.get('treasure', [])
-                )
+            if m_type in swarmed:
+                continue
+            monster = self._create_monster(m_type, adventure, rng)
+            if counts[m_type] < SWARM_SIZE or compile_abilities(monster.special_abilities):
                 monster_instances.append(monster)
             else:
-                # Use predefined monster
-                monster_instances.append(create_monster(m_type))
+                swarmed.add(m_type)
+                monster_instances.append(Swarm(monster, counts[m_type], rng))
+        return Combat(character, monster_instances, rng)
+        
+    def encounter_odds(self, character, adventure=None, weapon_damage="1d8"):
+        """
+        Odds of winning this node's fight.
+        
+        Fights of individual monsters without special abilities are solved
+        exactly (see odds.encounter_odds) when they are small enough.
+        Swarms, hordes, monsters with special abilities and fights too
+        large to solve are estimated with ODDS_TRIALS simulated fights
+        under the real combat rules instead.
         
-        return Combat(character, monster_instances)
+        Args:
+            character: Player character (not modified)
+            adventure: Adventure instance (optional, for custom monsters)
+            weapon_damage: Player weapon damage dice
+            
+        Returns:
+            Dictionary with victory/defeat/stalemate probabilities, expected
+            rounds, remaining HP on victory and 'exact' (False for estimates)
+        """
+        # Throwaway stream so building the fight does not consume game rolls
+        rng = dice.RNGStream()
+        combat = self.create_combat(character, adventure, rng)
+        monsters = combat.monsters
+        if combat.hooks is None and isinstance(monsters, list) and not any(
+                isinstance(monster, Swarm) for monster in monsters):
+            result = encounter_odds(character, monsters, weapon_damage)
+            if result is not None:
+                result['exact'] = True
+                return result
+            
+        stats = combat.simulate(ODDS_TRIALS, {'type': 'attack', 'weapon_damage': weapon_damage},
+                                rng=rng)
+        trials = stats['trials']
+        outcomes = stats['outcomes']
+        return {
+            'victory': outcomes['victory'] / trials,
+            'defeat': outcomes['defeat'] / trials,
+            'stalemate': outcomes['timeout'] / trials,
+            'expected_rounds': sum(r * count for r, count in stats['rounds'].items()) / trials,
+            'remaining_hp': {hp: count / trials for hp, count in stats['remaining_hp'].items()
+                             if hp > 0},
+            'exact': False
+        }
+        
+    def _create_monster(self, m_type, adventure, rng):
+        """Create one monster by name from the adventure's templates (custom first)"""
+        if adventure:
+            return adventure.spawn_monster(m_type, rng)
+        # Use predefined monster
+        return create_monster(m_type, rng)
         
     def collect_treasure(self, character):
         """
@@ -346,6 +411,9 @@ class Adventure:
     Manages all nodes and the flow between them.
     """
     
+    __slots__ = ('title', 'description', 'starting_node_id', 'nodes',
+                 'custom_monsters', 'monster_templates', '_owned_nodes')
+    
     def __init__(self, title, description, starting_node_id):
         """
         Initialize an adventure.
@@ -360,10 +428,56 @@ class Adventure:
         self.starting_node_id = starting_node_id
         self.nodes = {}  # Dictionary of node_id -> GameNode
         self.custom_monsters = {}  # Dictionary of custom monster definitions
+        self.monster_templates = {}  # Compiled monsters by name (see compile_monsters)
+        self._owned_nodes = None  # Node IDs copied by a fork (None = all nodes are ours)
+        
+    def fork(self):
+        """
+        Copy the adventure for an independent play session.
+        
+        Both adventures share every node until one of them changes it
+        (see own_node), and share the monster definitions outright, so
+        forking costs one dictionary copy.
+        
+        Returns:
+            Adventure sharing this one's nodes copy-on-write
+        """
+        fork = Adventure.__new__(Adventure)
+        fork.title = self.title
+        fork.description = self.description
+        fork.starting_node_id = self.starting_node_id
+        fork.nodes = dict(self.nodes)
+        fork.custom_monsters = self.custom_monsters
+        fork.monster_templates = self.monster_templates
+        fork._owned_nodes = set()
+        # Nodes are shared from now on, so this adventure copies before changing them too
+        self._owned_nodes = set()
+        return fork
+        
+    def own_node(self, node_id):
+        """
+        Get a node this adventure may change (e.g. clear its treasure).
+        
+        In a fork, a shared node is replaced by a shallow copy the first
+        time it is owned. Play only ever reassigns node state (treasure,
+        monsters), never mutates it in place, so the copy can keep
+        sharing its lists with the original.
+        
+        Returns:
+            GameNode, or None if there is no such node
+        """
+        node = self.nodes.get(node_id)
+        if node is None or self._owned_nodes is None or node_id in self._owned_nodes:
+            return node
+        node = self.nodes[node_id] = copy.copy(node)
+        self._owned_nodes.add(node_id)
+        return node
         
     def add_node(self, node):
         """Add a node to the adventure"""
         self.nodes[node.node_id] = node
+        if self._owned_nodes is not None:
+            self._owned_nodes.add(node.node_id)
         
     def get_node(self, node_id):
         """Get a node by ID"""
@@ -374,12 +488,79 @@ class Adventure:
         return self.nodes.get(self.starting_node_id)
     
     def add_custom_monster(self, monster_name, stats):
-        """Add a custom monster definition to the adventure"""
+        """
+        Add a custom monster definition to the adventure.
+        
+        Raises:
+            ValueError: If hit_dice or damage is not valid dice notation
+        """
+        try:
+            template = MonsterTemplate.from_stats(monster_name, stats)
+        except ValueError as e:
+            raise ValueError(f"Custom monster '{monster_name}': {e}") from None
         self.custom_monsters[monster_name] = stats
+        self.monster_templates[monster_name] = template
     
     def get_custom_monster(self, monster_name):
         """Get custom monster stats by name"""
         return self.custom_monsters.get(monster_name)
         
+    def get_monster_template(self, monster_name):
+        """
+        Get the compiled template for a monster name, compiling it on first use.
+        
+        Custom monsters take precedence over predefined types.
+        
+        Returns:
+            MonsterTemplate, or None if the name is unknown
+        """
+        template = self.monster_templates.get(monster_name)
+        if template is None:
+            if monster_name in self.custom_monsters:
+                template = MonsterTemplate.from_stats(monster_name, self.custom_monsters[monster_name])
+            else:
+                template = get_template(monster_name)
+                if template is None:
+                    return None
+            self.monster_templates[monster_name] = template
+        return template
+        
+    def compile_monsters(self):
+        """
+        Compile a template for every monster used by the adventure's nodes.
+        
+        Raises:
+            ValueError: If any node uses a monster that is neither custom
+                        nor predefined (all unknown names are listed)
+        """
+        unknown = {}
+        for node in self.nodes.values():
+            for m_type in node.monsters:
+                if self.get_monster_template(m_type) is None:
+                    unknown.setdefault(m_type, []).append(node.node_id)
+        if unknown:
+            details = '; '.join(f"'{name}' in node(s) {', '.join(sorted(set(node_ids)))}"
+                                for name, node_ids in unknown.items())
+            raise ValueError(f"Unknown monster type(s): {details}")
+            
+    def spawn_monster(self, monster_name, rng=None):
+        """
+        Create a monster by name from its compiled template.
+        
+        Args:
+            monster_name: Custom or predefined monster name
+            rng: RNGStream for the monster's rolls (default: global generator)
+            
+        Returns:
+            Monster instance
+            
+        Raises:
+            ValueError: If the name is unknown
+        """
+        template = self.get_monster_template(monster_name)
+        if template is None:
+            raise ValueError(f"Unknown monster type '{monster_name}'")
+        return template.spawn(rng)
+        
     def __str__(self):
         return f"{self.title}: {len(self.nodes)} locations"
@@ -0,0 +1,258 @@
+"""
+Exact encounter odds by dynamic programming over hit point states
+"""
+import dice
+
+# Fights needing more DP steps than this are not solved (about a quarter
+# second of work; 20 goblins against a level 5 Fighter need about 2e7)
+MAX_WORK = 2000000
+
+# Results of encounter_odds, keyed by character stats and monster set
+_ODDS_CACHE = {}
+
+
+def encounter_odds(character, monsters, weapon_damage="1d8", max_work=MAX_WORK):
+    """
+    Exact probabilities of victory and defeat for a fresh encounter.
+    
+    Uses the Combat.execute_round rules with the player always attacking
+    the first living monster (the same model as simulate_batch): initiative
+    is rolled once, monster HP comes from each monster's hit dice, and every
+    attack uses the exact damage distribution of its dice. Special
+    abilities (see abilities.py) are not modelled. The work grows with
+    the number of monsters and both sides' hit points, so fights above
+    max_work steps are refused rather than solved. Results are cached by
+    character class, level, abilities, HP and AC and by the monsters'
+    stats.
+    
+    Args:
+        character: Player character (not modified)
+        monsters: List of individual monsters (HP is re-rolled, not taken
+                  from the instances)
+        weapon_damage: Player weapon damage dice
+        max_work: Largest number of DP steps to run (None for no limit)
+    
+    Returns:
+        Dictionary with 'victory', 'defeat' and 'stalemate' probabilities,
+        'expected_rounds' (over fights that end) and 'remaining_hp'
+        ({hp: probability} on victory), or None if the fight is too
+        large to solve within max_work
+    """
+    key = (
+        character.char_class, character.level,
+        tuple(character.get_ability_modifier(a) for a in
+              ('strength', 'dexterity', 'constitution', 'intelligence', 'wisdom', 'charisma')),
+        character.current_hp, character.armor_class, character.base_attack_bonus,
+        str(dice.parse(weapon_damage)),
+        tuple((m.name, m.hit_dice, m.armor_class, m.attack_bonus, m.damage) for m in monsters),
+        max_work
+    )
+    if key in _ODDS_CACHE:
+        result = _ODDS_CACHE[key]
+    else:
+        result = _ODDS_CACHE[key] = _solve_encounter(character, monsters, weapon_damage, max_work)
+    if result is None:
+        return None
+    return dict(result, remaining_hp=dict(result['remaining_hp']))
+
+
+def clear_cache():
+    """Forget all cached encounter odds"""
+    _ODDS_CACHE.clear()
+
+
+def _hit_chance(attack_bonus, armor_class):
+    """Probability that d20 + attack_bonus >= armor_class"""
+    return max(0, min(20, 21 - (armor_class - attack_bonus))) / 20
+
+
+def _attack_pmf(hit_chance, damage_pmf, cap):
+    """Damage from one attack as {damage: probability}, lumping damage >= cap"""
+    pmf = {0: 1 - hit_chance}
+    for value, p in damage_pmf.items():
+        value = min(value, cap)
+        pmf[value] = pmf.get(value, 0.0) + hit_chance * p
+    return pmf
+
+
+def _add_pmfs(a, b, cap):
+    """Distribution of the sum of two independent damages, lumping >= cap"""
+    total = {}
+    for x, px in a.items():
+        for y, py in b.items():
+            value = min(x + y, cap)
+            total[value] = total.get(value, 0.0) + px * py
+    return total
+
+
+def _mix_pmfs(weight, a, b):
+    """weight * a + (1 - weight) * b"""
+    mixed = {value: weight * p for value, p in a.items()}
+    for value, p in b.items():
+        mixed[value] = mixed.get(value, 0.0) + (1 - weight) * p
+    return mixed
+
+
+def _solve_encounter(character, monsters, weapon_damage, max_work=None):
+    """Compute encounter_odds without the cache (None if over max_work)"""
+    start_hp = character.current_hp
+    if start_hp <= 0:
+        return {'victory': 0.0, 'defeat': 1.0, 'stalemate': 0.0,
+                'expected_rounds': 0.0, 'remaining_hp': {}}
+    if not monsters:
+        return {'victory': 1.0, 'defeat': 0.0, 'stalemate': 0.0,
+                'expected_rounds': 0.0, 'remaining_hp': {start_hp: 1.0}}
+    
+    str_mod = character.get_ability_modifier('strength')
+    dex_mod = character.get_ability_modifier('dexterity')
+    player_attack = character.base_attack_bonus + str_mod
+    
+    player_damage = {}
+    for value, p in dice.distribution(weapon_damage).pmf().items():
+        value = max(1, value + str_mod)
+        player_damage[value] = player_damage.get(value, 0.0) + p
+    
+    # Per monster: player's hit chance, starting HP, damage dealt to the player
+    # (damage of start_hp or more is always lethal, so it is lumped there)
+    player_hits = [_hit_chance(player_attack, m.armor_class) for m in monsters]
+    start_hps = [dice.distribution(m.hit_dice).clamp(1).pmf() for m in monsters]
+    attacks = [_attack_pmf(_hit_chance(m.attack_bonus, character.armor_class),
+                           m.damage_distribution().pmf(), start_hp) for m in monsters]
+    
+    # incoming[t]: total damage from monsters t.. when all of them attack
+    incoming = [{0: 1.0}]
+    for attack in reversed(attacks):
+        incoming.append(_add_pmfs(incoming[-1], attack, start_hp))
+    incoming.reverse()
+    
+    # A monster acts before the player only on a strictly higher initiative,
+    # which matters in the round it dies. Condition on the player's roll.
+    first_chances = {}
+    for roll in range(1, 21):
+        chance = max(0, min(20, 20 - (roll + dex_mod))) / 20
+        first_chances[chance] = first_chances.get(chance, 0) + 1 / 20
+    
+    # Steps per initiative case: every (target HP, player HP) state takes the
+    # player's damage and the monsters' damage, and every kill spreads over
+    # the next target's HP
+    work = len(first_chances) * sum(
+        (max(start_hps[t]) + 1) * start_hp * (len(player_damage) + len(incoming[t]))
+        + start_hp * len(incoming[t]) * (len(start_hps[t + 1]) if t + 1 < len(start_hps) else 1)
+        for t in range(len(start_hps)))
+    if max_work is not None and work > max_work:
+        return None
+    
+    result = {'victory': 0.0, 'defeat': 0.0, 'stalemate': 0.0,
+              'expected_rounds': 0.0, 'remaining_hp': {}}
+    for first_chance, weight in first_chances.items():
+        _solve_with_initiative(result, weight, first_chance, start_hp, player_damage,
+                               player_hits, start_hps, incoming)
+    
+    ended = result['victory'] + result['defeat']
+    result['expected_rounds'] = result['expected_rounds'] / ended if ended else 0.0
+    result['remaining_hp'] = dict(sorted(result['remaining_hp'].items()))
+    return result
+
+
+def _solve_with_initiative(result, weight, first_chance, start_hp, player_damage,
+                           player_hits, start_hps, incoming):
+    """
+    Add one initiative case to result.
+    
+    The state is (target index, target HP, player HP); monsters behind the
+    target are untouched, so their HP is drawn when they become the target.
+    Every transition lowers a hit point total or moves to the next target
+    except the "nothing happened" self-loop, so states are visited once in
+    order and the self-loop is folded in as a geometric series.
+    
+    Hits are collected before the monsters' damage is applied: hits that
+    leave the target at h wait in wounded[h] until that plane is reached,
+    and kills are summed by player HP, so each damage distribution is
+    applied once per state rather than once per (state, player damage).
+    """
+    n_monsters = len(start_hps)
+    remaining_hp = result['remaining_hp']
+    
+    # inflow[h][hp]: probability of entering (target, h, hp) from outside its plane
+    inflow = _empty_states(start_hps[0], start_hp)
+    for h, p in start_hps[0].items():
+        inflow[h][start_hp] += weight * p
+    
+    for target in range(n_monsters):
+        hit = player_hits[target]
+        alive_damage = incoming[target]
+        # In the round the target dies it still attacks if it acts first
+        dead_damage = _mix_pmfs(first_chance, incoming[target], incoming[target + 1])
+        no_damage = alive_damage.get(0, 0.0)
+        stay = 1 - hit
+        stuck = stay * no_damage >= 1.0
+        next_inflow = (_empty_states(start_hps[target + 1], start_hp)
+                       if target + 1 < n_monsters else None)
+        # wounded[h][hp]: the player hit the target down to h, monsters still to attack
+        wounded = _empty_states(start_hps[target], start_hp)
+        # killed[hp]: the player killed the target, monsters still to attack
+        killed = [0.0] * (start_hp + 1)
+        
+        for h in range(len(inflow) - 1, 0, -1):
+            plane = inflow[h]
+            for hp, total in enumerate(wounded[h]):
+                if not total:
+                    continue
+                for damage, p in alive_damage.items():
+                    if damage >= hp:
+                        result['defeat'] += total * p
+                    else:
+                        plane[hp - damage] += total * p
+            if not any(plane):
+                continue
+            
+            # Expected visits per player HP: the player's miss keeps the
+            # target at h, so damage taken feeds lower HP in this plane
+            visits = [0.0] * (start_hp + 1)
+            for hp in range(start_hp, 0, -1):
+                total = plane[hp]
+                if not total:
+                    continue
+                if stuck:
+                    result['stalemate'] += total
+                    continue
+                total /= 1 - stay * no_damage
+                visits[hp] = total
+                for damage, p in alive_damage.items():
+                    if not damage:
+                        continue
+                    if damage >= hp:
+                        result['defeat'] += total * stay * p
+                    else:
+                        plane[hp - damage] += total * stay * p
+            
+            for hp in range(start_hp, 0, -1):
+                total = visits[hp]
+                if not total:
+                    continue
+                result['expected_rounds'] += total
+                for dealt, p_dealt in player_damage.items():
+                    if dealt < h:
+                        wounded[h - dealt][hp] += total * hit * p_dealt
+                    else:
+                        killed[hp] += total * hit * p_dealt
+        
+        for hp, total in enumerate(killed):
+            if not total:
+                continue
+            for damage, p in dead_damage.items():
+                branch = total * p
+                if damage >= hp:
+                    result['defeat'] += branch
+                elif next_inflow is None:
+                    result['victory'] += branch
+                    remaining_hp[hp - damage] = remaining_hp.get(hp - damage, 0.0) + branch
+                else:
+                    for next_h, p_h in start_hps[target + 1].items():
+                        next_inflow[next_h][hp - damage] += branch * p_h
+        inflow = next_inflow
+
+
+def _empty_states(hp_pmf, player_hp):
+    """Zeroed probabilities indexed by [monster hp][player hp]"""
+    return [[0.0] * (player_hp + 1) for _ in range(max(hp_pmf) + 1)]
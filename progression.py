@@ -0,0 +1,91 @@
+"""
+Class progression tables for levels 1-20
+
+Every class's hit points, base attack bonus, saves and spell slots per
+level are computed once at import. Character looks its level up in
+PROGRESSION instead of recomputing the formulas.
+"""
+from collections import namedtuple
+
+MAX_LEVEL = 20
+
+# Hit points exclude the Constitution modifier, which adds once per level
+LevelStats = namedtuple('LevelStats', 'hit_points base_attack_bonus fortitude_save '
+                                      'reflex_save will_save spell_slots')
+
+# Spells per day by character level: slots for spell levels 0, 1, 2, ...
+WIZARD_SLOTS = (
+    (3, 1), (3, 2), (3, 2, 1), (4, 3, 2), (4, 3, 2, 1),
+    (4, 3, 3, 2), (4, 4, 3, 2, 1), (4, 4, 3, 3, 2), (4, 4, 4, 3, 2, 1), (4, 4, 4, 3, 3, 2),
+    (4, 4, 4, 4, 3, 2, 1), (4, 4, 4, 4, 3, 3, 2), (4, 4, 4, 4, 4, 3, 2, 1),
+    (4, 4, 4, 4, 4, 3, 3, 2), (4, 4, 4, 4, 4, 4, 3, 2, 1), (4, 4, 4, 4, 4, 4, 3, 3, 2),
+    (4, 4, 4, 4, 4, 4, 4, 3, 2, 1), (4, 4, 4, 4, 4, 4, 4, 3, 3, 2),
+    (4, 4, 4, 4, 4, 4, 4, 4, 3, 3), (4, 4, 4, 4, 4, 4, 4, 4, 4, 4),
+)
+CLERIC_SLOTS = (
+    (3, 1), (4, 2), (4, 2, 1), (5, 3, 2), (5, 3, 2, 1),
+    (5, 3, 3, 2), (6, 4, 3, 2, 1), (6, 4, 3, 3, 2), (6, 4, 4, 3, 2, 1), (6, 4, 4, 3, 3, 2),
+    (6, 5, 4, 4, 3, 2, 1), (6, 5, 4, 4, 3, 3, 2), (6, 5, 5, 4, 4, 3, 2, 1),
+    (6, 5, 5, 4, 4, 3, 3, 2), (6, 5, 5, 5, 4, 4, 3, 2, 1), (6, 5, 5, 5, 4, 4, 3, 3, 2),
+    (6, 5, 5, 5, 5, 4, 4, 3, 2, 1), (6, 5, 5, 5, 5, 4, 4, 3, 3, 2),
+    (6, 5, 5, 5, 5, 5, 4, 4, 3, 3), (6, 5, 5, 5, 5, 5, 4, 4, 4, 4),
+)
+
+# Base attack bonus progressions
+ATTACK_PROGRESSIONS = {
+    'full': lambda level: level,
+    'three_quarters': lambda level: (level * 3) // 4,
+    'half': lambda level: level // 2,
+}
+
+CLASS_RULES = {
+    'Fighter': {'first_hp': 10, 'hp_per_level': 6, 'attack': 'full',
+                'good_saves': ('fortitude',), 'spell_slots': None},
+    'Wizard': {'first_hp': 4, 'hp_per_level': 3, 'attack': 'half',
+               'good_saves': ('will',), 'spell_slots': WIZARD_SLOTS},
+    'Rogue': {'first_hp': 6, 'hp_per_level': 4, 'attack': 'three_quarters',
+              'good_saves': ('reflex',), 'spell_slots': None},
+    'Cleric': {'first_hp': 8, 'hp_per_level': 5, 'attack': 'three_quarters',
+               'good_saves': ('fortitude', 'will'), 'spell_slots': CLERIC_SLOTS},
+}
+
+
+def _level_stats(rules, level):
+    """Compute one row of a class's progression"""
+    saves = [2 + level // 2 if save in rules['good_saves'] else level // 3
+             for save in ('fortitude', 'reflex', 'will')]
+    slots = {}
+    if rules['spell_slots'] is not None:
+        per_day = rules['spell_slots'][min(level, MAX_LEVEL) - 1]
+        slots = dict(enumerate(per_day))
+    return LevelStats(rules['first_hp'] + (level - 1) * rules['hp_per_level'],
+                      ATTACK_PROGRESSIONS[rules['attack']](level), *saves, slots)
+
+
+# PROGRESSION[class][level] for levels 1-20 (index 0 is unused)
+PROGRESSION = {
+    name: (None,) + tuple(_level_stats(rules, level) for level in range(1, MAX_LEVEL + 1))
+    for name, rules in CLASS_RULES.items()
+}
+
+
+def level_stats(char_class, level):
+    """
+    Progression row for a class and level.
+    
+    Levels above 20 follow the same formulas with level 20 spell slots.
+    Treat the returned spell_slots dict as read-only.
+    
+    Args:
+        char_class: Class name, e.g. "Fighter"
+        level: Character level (1 or higher)
+    
+    Returns:
+        LevelStats, or None for classes without a progression
+    """
+    table = PROGRESSION.get(char_class)
+    if table is None:
+        return None
+    if level <= MAX_LEVEL:
+        return table[level]
+    return _level_stats(CLASS_RULES[char_class], level)
@@ -0,0 +1,239 @@
+"""
+Vectorized Monte Carlo simulation of combat encounters (requires NumPy)
+"""
+import abilities
+import dice
+from dice import np
+from effects import duration_rounds
+
+
+def simulate_lockstep(character, monsters, n_trials, weapon_damage="1d8",
+                      max_rounds=100, rng=None, reroll_initiative=False):
+    """
+    Simulate n independent copies of one encounter in lockstep.
+    
+    Every copy advances one round per step using the Combat.execute_round
+    rules with the player always attacking the first living monster.
+    Character HP and each monster's HP are held in NumPy arrays; hits,
+    damage and deaths are array operations, and finished fights are
+    dropped from the working set. Monster special abilities (regeneration,
+    poison, breath weapons) run as array operations too.
+    
+    Args:
+        character: Player character (not modified)
+        monsters: List of monsters, e.g. Combat.monsters (not modified)
+        n_trials: Number of fights to simulate
+        weapon_damage: Player weapon damage dice
+        max_rounds: Rounds after which a fight counts as a 'timeout'
+        rng: RNGStream to draw from (default: module-level NumPy generator)
+        reroll_initiative: Re-roll initiative every round instead of once
+                           per fight
+    
+    Returns:
+        Dictionary with win_rate, outcome counts, and histograms of rounds
+        and remaining HP (same shape as Combat.simulate)
+    """
+    dice._require_numpy()
+    generator = dice._np_generator(rng)
+    
+    n_monsters = len(monsters)
+    str_mod = character.get_ability_modifier('strength')
+    dex_mod = character.get_ability_modifier('dexterity')
+    base_attack = character.base_attack_bonus
+    player_ac = character.armor_class
+    monster_ac = np.array([m.armor_class for m in monsters], dtype=np.int64)
+    monster_attack = np.array([m.attack_bonus for m in monsters], dtype=np.int32)
+    monster_damage = [dice.parse(m.damage) for m in monsters]
+    
+    # Special abilities by type: lists of (monster column, effect)
+    regeneration, poison, breath = [], [], []
+    for j, monster in enumerate(monsters):
+        for effect in abilities.compile_abilities(monster.special_abilities):
+            if isinstance(effect, abilities.Regeneration):
+                regeneration.append((j, effect))
+            elif isinstance(effect, abilities.Poison):
+                poison.append((j, effect))
+            elif isinstance(effect, abilities.BreathWeapon):
+                breath.append((j, effect))
+    
+    # Working set: only fights that are still running. Per-monster columns
+    # are stored monster-major, (monsters, fights), so each row is contiguous.
+    active = np.arange(n_trials)
+    hp = np.full(n_trials, character.current_hp, dtype=np.int64)
+    monster_hp = np.empty((n_monsters, n_trials), dtype=np.int64)
+    for j, monster in enumerate(monsters):
+        monster_hp[j] = np.maximum(1, dice.roll_expr_many(monster.hit_dice, n_trials, rng))
+    goes_first = None
+    
+    # Only the player damages monsters, always the first living one, so they
+    # die in order: target is the first living monster and monster j is
+    # alive exactly when j >= target (target == n_monsters means victory)
+    target = np.zeros(n_trials, dtype=np.int64)
+    
+    # Per-fight ability state: strength (lowered by poison), monster max HP
+    # (regeneration cap) and the round each breath weapon is ready again
+    strength = np.full(n_trials, character.strength, dtype=np.int64) if poison else None
+    
+    # Poison wears off like a timed effect: a timer wheel with one slot per
+    # round of the longest duration holds the strength lost, by expiry round.
+    # The wheel and the regeneration caps are indexed by trial, not by
+    # working-set row, so they are never compacted.
+    wheel_size = max([duration_rounds(effect.duration) or 1 for _, effect in poison], default=1)
+    strength_wheel = np.zeros((wheel_size, n_trials), dtype=np.int64) if poison else None
+    max_hp = monster_hp.copy() if regeneration else None
+    breath_ready = np.ones((len(breath), n_trials), dtype=np.int64)
+    
+    # Results indexed by trial: 0 = timeout, 1 = victory, 2 = defeat
+    outcome = np.zeros(n_trials, dtype=np.int8)
+    rounds = np.full(n_trials, max_rounds, dtype=np.int64)
+    final_hp = np.zeros(n_trials, dtype=np.int64)
+    
+    for round_number in range(1, max_rounds + 1):
+        k = active.size
+        if k == 0:
+            break
+        
+        # Initiative: a monster goes before the player only on a strictly
+        # higher roll (ties keep the player first, as in TurnScheduler)
+        if goes_first is None or reroll_initiative:
+            initiative = generator.integers(1, 21, size=(1 + n_monsters, k), dtype=np.int32)
+            goes_first = initiative[1:] > initiative[0] + dex_mod
+        
+        # Start-of-round breath weapons
+        for b, (j, effect) in enumerate(breath):
+            fire = np.flatnonzero((breath_ready[b] <= round_number) & (target <= j))
+            if fire.size:
+                damage = dice.roll_expr_many(effect.damage, fire.size, rng)
+                save_bonus = getattr(character, effect.save + '_save')
+                saved = generator.integers(1, 21, size=fire.size) + save_bonus >= effect.dc
+                hp[fire] -= np.where(saved, damage // 2, damage)
+                breath_ready[b, fire] = (round_number + 1
+                                         + dice.roll_expr_many(effect.recharge, fire.size, rng))
+        
+        # Attack rolls for the round in one draw: player, then each monster
+        d20 = generator.integers(1, 21, size=(1 + n_monsters, k), dtype=np.int32)
+        monster_hits = d20[1:] + monster_attack[:, None] >= player_ac
+        
+        # Poison from monsters that hit before the player's turn
+        if poison:
+            _apply_poison(poison, lambda j: monster_hits[j] & goes_first[j] & (target <= j),
+                          strength, strength_wheel, active, round_number, character,
+                          generator, rng, player_acted=False)
+        
+        # Player attacks the first living monster (every running fight has one)
+        killed_by = target
+        if n_monsters:
+            round_str_mod = (strength - 10) // 2 if poison else str_mod
+            hit = np.flatnonzero(d20[0] + base_attack + round_str_mod >= monster_ac[target])
+            if hit.size:
+                if poison:
+                    round_str_mod = round_str_mod[hit]
+                damage = dice.roll_expr_many(weapon_damage, hit.size, rng) + round_str_mod
+                struck = target[hit]
+                monster_hp[struck, hit] -= np.maximum(1, damage)
+                killed = hit[monster_hp[struck, hit] <= 0]
+                if killed.size:
+                    target = target.copy()
+                    target[killed] += 1
+        
+        # Monsters act if alive at their turn in the initiative order
+        hits = [monster_hits[j] & ((target <= j) | (goes_first[j] & (killed_by <= j)))
+                for j in range(n_monsters)]
+        for j in range(n_monsters):
+            hit = np.flatnonzero(hits[j])
+            if hit.size:
+                hp[hit] -= np.maximum(1, dice.roll_expr_many(monster_damage[j], hit.size, rng))
+        if poison:
+            _apply_poison(poison, lambda j: hits[j] & ~goes_first[j], strength, strength_wheel,
+                          active, round_number, character, generator, rng)
+        
+        # End-of-round regeneration for monsters still standing
+        for j, effect in regeneration:
+            standing = np.flatnonzero(target <= j)
+            monster_hp[j, standing] = np.minimum(max_hp[j, active[standing]],
+                                                 monster_hp[j, standing] + effect.amount)
+        
+        # Poison that wears off at the player's next turn (EffectTimeline.tick)
+        if poison:
+            slot = strength_wheel[round_number % wheel_size]
+            strength -= slot[active]
+            slot[active] = 0
+        
+        defeat = hp <= 0
+        finished = defeat | (target == n_monsters)
+        ended = np.flatnonzero(finished)
+        if ended.size:
+            done = active[ended]
+            outcome[done] = np.where(defeat[ended], 2, 1)
+            rounds[done] = round_number
+            final_hp[done] = hp[ended]
+            
+            keep = np.flatnonzero(~finished)
+            active = active[keep]
+            hp = hp[keep]
+            target = target[keep]
+            monster_hp = monster_hp.take(keep, axis=1)
+            goes_first = goes_first.take(keep, axis=1)
+            if poison:
+                strength = strength[keep]
+            if breath:
+                breath_ready = breath_ready.take(keep, axis=1)
+    
+    final_hp[active] = hp
+    
+    counts = np.bincount(outcome, minlength=3)
+    return {
+        'trials': n_trials,
+        'win_rate': counts[1] / n_trials if n_trials else 0.0,
+        'outcomes': {
+            'victory': int(counts[1]),
+            'defeat': int(counts[2]),
+            'fled': 0,
+            'timeout': int(counts[0])
+        },
+        'rounds': _histogram(rounds),
+        'remaining_hp': _histogram(np.maximum(0, final_hp))
+    }
+
+
+def _apply_poison(poison, hits, strength, strength_wheel, active, round_number, character,
+                  generator, rng, player_acted=True):
+    """
+    Resolve poison for the hits of each poisonous monster.
+    
+    hits(j) gives the mask of working-set rows where monster j hit.
+    
+    Only strength loss changes this model's fights (it lowers the player's
+    attack and damage), so other ability losses are not tracked. The
+    strength actually lost is filed in strength_wheel (indexed by trial;
+    active maps working-set rows to trials) under the last round whose
+    player attack it affects. Combat ticks the timeline at the start of the
+    player's turn, so poison taken before the player acted (player_acted
+    False) wears off one round earlier.
+    """
+    for j, effect in poison:
+        if effect.ability != 'strength':
+            continue
+        poisoned = np.flatnonzero(hits(j))
+        if not poisoned.size:
+            continue
+        save_bonus = getattr(character, effect.save + '_save')
+        failed = poisoned[generator.integers(1, 21, size=poisoned.size) + save_bonus < effect.dc]
+        if not failed.size:
+            continue
+        loss = dice.roll_expr_many(effect.damage, failed.size, rng)
+        score = strength[failed]
+        change = np.maximum(1, score - loss) - score
+        rounds = duration_rounds(effect.duration)
+        if rounds is None:
+            strength[failed] += change
+        elif rounds and (player_acted or rounds > 1):
+            last_round = round_number + rounds - (1 if player_acted else 2)
+            strength[failed] += change
+            strength_wheel[last_round % len(strength_wheel), active[failed]] += change
+
+
+def _histogram(values):
+    """Convert an array of non-negative ints to a {value: count} dict"""
+    counts = np.bincount(values) if values.size else np.zeros(0, dtype=np.int64)
+    return {int(v): int(c) for v, c in enumerate(counts) if c}
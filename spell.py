@@ -1,14 +1,28 @@
 """
 Spell system based on OGL D20 rules
 """
+from collections import Counter
+
 import dice
 
+# Batches of at least this many saving throws are rolled with NumPy when available
+SAVE_BATCH_MIN = 16
+
 
 class Spell:
     """Base spell class"""
     
+    __slots__ = ('name', 'level', 'school', 'casting_time', 'range_ft',
+                 'duration', 'description', 'damage_dice')
+    
+    # Beneficial spells are cast on the caster, not the combat target
+    targets_self = False
+    # Area spells are cast on every monster in the fight (see AreaSpell)
+    area = False
+    
     def __init__(self, name, level, school, casting_time="1 action", 
-                 range_ft=30, duration="Instantaneous", description=""):
+                 range_ft=30, duration="Instantaneous", description="",
+                 damage_dice=None):
         self.name = name
         self.level = level  # 0 for cantrips, 1-9 for spell levels
         self.school = school  # Evocation, Abjuration, etc.
@@ -16,6 +30,38 @@ class Spell:
         self.range_ft = range_ft
         self.duration = duration
         self.description = description
+        self.damage_dice = damage_dice  # Dice string for damage spells, e.g. "8d6"
+        
+    def damage_distribution(self):
+        """
+        Exact distribution of the spell's damage roll (before saves).
+        
+        Returns:
+            dice.Distribution, or None for spells that deal no damage
+        """
+        if self.damage_dice is None:
+            return None
+        return dice.distribution(self.damage_dice)
+        
+    def apply_timed(self, caster, target, modifiers):
+        """
+        Apply modifiers to a target for the spell's duration.
+        
+        The effect goes on the target's timeline when it has one (player
+        characters), otherwise on the caster's.
+        
+        Args:
+            caster: Character casting the spell
+            target: Creature receiving the modifiers
+            modifiers: Dictionary of attribute -> amount to add
+            
+        Returns:
+            List of TimedEffects added
+        """
+        timeline = getattr(target, 'effects', None)
+        if timeline is None:
+            timeline = caster.effects
+        return timeline.add(self.name, target, modifiers, self.duration)
         
     def cast(self, caster, target=None):
         """
@@ -38,64 +84,142 @@ class Spell:
 class MagicMissile(Spell):
     """Magic Missile spell - automatic hit"""
     
+    __slots__ = ()
+    
     def __init__(self):
         super().__init__(
             name="Magic Missile",
             level=1,
             school="Evocation",
             range_ft=120,
-            description="Three glowing darts strike unerringly. Each dart deals 1d4+1 force damage."
+            description="Three glowing darts strike unerringly. Each dart deals 1d4+1 force damage.",
+            damage_dice="3d4+3"  # Three darts of 1d4+1
         )
         
     def cast(self, caster, target=None):
         if target is None:
             return "No target selected for Magic Missile"
             
-        missiles = 3
-        total_damage = 0
-        for _ in range(missiles):
-            damage = dice.d4(1, 1)
-            total_damage += damage
-            
+        total_damage = dice.sampler(self.damage_dice).sample(caster.rng)
         target.take_damage(total_damage)
         return f"{self.name} hits {target.name} for {total_damage} force damage!"
 
 
-class Fireball(Spell):
+def saving_throws(targets, save_type, rng=None):
+    """
+    Roll one saving throw per target in a single batch.
+    
+    Args:
+        targets: Creatures with <save_type>_save bonuses
+        save_type: 'fortitude', 'reflex' or 'will'
+        rng: RNGStream for the rolls (default: global generators)
+        
+    Returns:
+        List of save totals, aligned with targets
+    """
+    bonuses = [getattr(target, save_type + '_save') for target in targets]
+    if dice.NUMPY_ENABLED and len(bonuses) >= SAVE_BATCH_MIN:
+        return dice.d20_many(len(bonuses), bonuses, rng).tolist()
+    return [dice.d20(1, bonus, rng) for bonus in bonuses]
+
+
+class AreaSpell(Spell):
+    """
+    Damage spell that hits every target in its area.
+    
+    The damage is rolled once, every target's saving throw is rolled in
+    one batch, and the results are applied in a single pass. Swarms and
+    MonsterTables (anything with an area_damage method) resolve their own
+    members in bulk.
+    """
+    
+    __slots__ = ()
+    area = True
+    
+    # Overridden by subclasses
+    save = 'reflex'
+    save_dc = 15
+    damage_type = "fire"
+    intro = "{spell} engulfs the area!"
+    saved_text = "{target} saves! Takes {damage} {damage_type} damage (halved)."
+    failed_text = "{target} fails save! Takes {damage} {damage_type} damage!"
+    
+    def cast(self, caster, target=None):
+        """
+        Cast the spell on one target or a list of targets.
+        
+        Args:
+            caster: Character casting the spell
+            target: Monster, list of monsters, or MonsterTable
+            
+        Returns:
+            Result description
+        """
+        if target is None or (isinstance(target, list) and not target):
+            return f"No target selected for {self.name}"
+        targets = target if isinstance(target, list) else [target]
+        intro = self.intro.format(spell=self.name, caster=caster.name)
+        
+        damage = dice.sampler(self.damage_dice).sample(caster.rng)
+        half = damage // 2
+        
+        # Single monsters: one batch of saves, then one pass of damage
+        singles = [t for t in targets if not hasattr(t, 'area_damage')]
+        saves = saving_throws(singles, self.save, caster.rng)
+        hit, saved, slain = 0, 0, Counter()
+        for monster, roll in zip(singles, saves):
+            success = roll >= self.save_dc
+            monster.take_damage(half if success else damage)
+            hit += 1
+            saved += success
+            if not monster.is_alive():
+                slain[monster.name] += 1
+                
+        # Groups resolve all their members at once
+        for group in targets:
+            if hasattr(group, 'area_damage'):
+                group_hit, group_saved, group_slain = group.area_damage(
+                    damage, self.save, self.save_dc, caster.rng)
+                hit += group_hit
+                saved += group_saved
+                slain.update(group_slain)
+                
+        if len(targets) == 1 and hit == 1:
+            text = self.saved_text if saved else self.failed_text
+            result = text.format(target=targets[0].name, damage=half if saved else damage,
+                                 damage_type=self.damage_type)
+            return f"{intro} {result}"
+            
+        result = (f"{intro} {hit} targets take {damage} {self.damage_type} damage "
+                  f"({saved} save for {half}).")
+        if slain:
+            result += " Slain: " + ", ".join(
+                name if count == 1 else f"{count} x {name}" for name, count in slain.items()) + "."
+        return result
+
+
+class Fireball(AreaSpell):
     """Fireball spell - area effect damage"""
     
+    __slots__ = ()
+    
     def __init__(self):
         super().__init__(
             name="Fireball",
             level=3,
             school="Evocation",
             range_ft=150,
-            description="A bright streak explodes with a roar dealing 8d6 fire damage. Reflex save DC 15 for half."
+            description="A bright streak explodes with a roar dealing 8d6 fire damage. Reflex save DC 15 for half.",
+            damage_dice="8d6"
         )
-        
-    def cast(self, caster, target=None):
-        if target is None:
-            return "No target selected for Fireball"
-            
-        damage = dice.d6(8)
-        
-        # Target makes Reflex save
-        save_dc = 15
-        save_roll = target.saving_throw('reflex')
-        
-        if save_roll >= save_dc:
-            damage = damage // 2
-            result = f"{target.name} saves! Takes {damage} fire damage (halved)."
-        else:
-            result = f"{target.name} fails save! Takes {damage} fire damage!"
-            
-        target.take_damage(damage)
-        return f"{self.name} engulfs the area! {result}"
 
 
 class CureWounds(Spell):
     """Cure Light Wounds - healing spell"""
     
+    __slots__ = ()
+    targets_self = True
+    
     def __init__(self):
         super().__init__(
             name="Cure Light Wounds",
@@ -110,8 +234,8 @@ class CureWounds(Spell):
         if target is None:
             target = caster
             
-        wis_mod = caster.get_ability_modifier('wisdom')
-        healing = dice.d8(1, wis_mod)
+        wis_mod = caster.wis_mod
+        healing = dice.d8(1, wis_mod, caster.rng)
         target.heal(healing)
         
         return f"{self.name} heals {target.name} for {healing} HP! ({target.current_hp}/{target.max_hp})"
@@ -120,6 +244,9 @@ class CureWounds(Spell):
 class Shield(Spell):
     """Shield spell - protective magic"""
     
+    __slots__ = ()
+    targets_self = True
+    
     def __init__(self):
         super().__init__(
             name="Shield",
@@ -134,76 +261,57 @@ class Shield(Spell):
         if target is None:
             target = caster
             
-        # Temporarily increase AC
-        target.armor_class += 4
+        # +4 AC until the start of the caster's next turn
+        self.apply_timed(caster, target, {'armor_class': 4})
         return f"A shimmering shield surrounds {target.name}! AC increased to {target.armor_class}."
 
 
-class BurningHands(Spell):
+class BurningHands(AreaSpell):
     """Burning Hands - cone of fire"""
     
+    __slots__ = ()
+    save_dc = 13
+    intro = "Flames shoot from {caster}'s hands!"
+    saved_text = "{target} partially dodges! Takes {damage} {damage_type} damage (halved)."
+    failed_text = "{target} is engulfed! Takes {damage} {damage_type} damage!"
+    
     def __init__(self):
         super().__init__(
             name="Burning Hands",
             level=1,
             school="Evocation",
             range_ft=15,
-            description="A cone of fire deals 3d4 fire damage. Reflex save DC 13 for half."
+            description="A cone of fire deals 3d4 fire damage. Reflex save DC 13 for half.",
+            damage_dice="3d4"
         )
-        
-    def cast(self, caster, target=None):
-        if target is None:
-            return "No target selected for Burning Hands"
-            
-        damage = dice.d4(3)
-        
-        save_dc = 13
-        save_roll = target.saving_throw('reflex')
-        
-        if save_roll >= save_dc:
-            damage = damage // 2
-            result = f"{target.name} partially dodges! Takes {damage} fire damage (halved)."
-        else:
-            result = f"{target.name} is engulfed! Takes {damage} fire damage!"
-            
-        target.take_damage(damage)
-        return f"Flames shoot from {caster.name}'s hands! {result}"
 
 
-class LightningBolt(Spell):
+class LightningBolt(AreaSpell):
     """Lightning Bolt - line of electricity"""
     
+    __slots__ = ()
+    damage_type = "electricity"
+    intro = "A bolt of lightning streaks forth!"
+    saved_text = "{target} partially evades! Takes {damage} {damage_type} damage (halved)."
+    failed_text = "{target} is struck! Takes {damage} {damage_type} damage!"
+    
     def __init__(self):
         super().__init__(
             name="Lightning Bolt",
             level=3,
             school="Evocation",
             range_ft=120,
-            description="A stroke of lightning deals 8d6 electricity damage. Reflex save DC 15 for half."
+            description="A stroke of lightning deals 8d6 electricity damage. Reflex save DC 15 for half.",
+            damage_dice="8d6"
         )
-        
-    def cast(self, caster, target=None):
-        if target is None:
-            return "No target selected for Lightning Bolt"
-            
-        damage = dice.d6(8)
-        
-        save_dc = 15
-        save_roll = target.saving_throw('reflex')
-        
-        if save_roll >= save_dc:
-            damage = damage // 2
-            result = f"{target.name} partially evades! Takes {damage} electricity damage (halved)."
-        else:
-            result = f"{target.name} is struck! Takes {damage} electricity damage!"
-            
-        target.take_damage(damage)
-        return f"A bolt of lightning streaks forth! {result}"
 
 
 class Bless(Spell):
     """Bless - buff spell"""
     
+    __slots__ = ()
+    targets_self = True
+    
     def __init__(self):
         super().__init__(
             name="Bless",
@@ -217,14 +325,16 @@ class Bless(Spell):
         if target is None:
             target = caster
             
-        # Simple implementation: temporary BAB boost
-        target.base_attack_bonus += 1
+        # +1 to attack for the spell's duration
+        self.apply_timed(caster, target, {'base_attack_bonus': 1})
         return f"{target.name} is blessed! Attack bonus increased."
 
 
 class DetectMagic(Spell):
     """Detect Magic cantrip"""
     
+    __slots__ = ()
+    
     def __init__(self):
         super().__init__(
             name="Detect Magic",
@@ -242,13 +352,16 @@ class DetectMagic(Spell):
 class RayOfFrost(Spell):
     """Ray of Frost cantrip"""
     
+    __slots__ = ()
+    
     def __init__(self):
         super().__init__(
             name="Ray of Frost",
             level=0,
             school="Evocation",
             range_ft=60,
-            description="A frigid beam deals 1d8 cold damage."
+            description="A frigid beam deals 1d8 cold damage.",
+            damage_dice="1d8"
         )
         
     def cast(self, caster, target=None):
@@ -256,11 +369,11 @@ class RayOfFrost(Spell):
             return "No target selected for Ray of Frost"
             
         # Make a ranged touch attack
-        int_mod = caster.get_ability_modifier('intelligence')
-        attack_roll = dice.d20(1, caster.base_attack_bonus + int_mod)
+        int_mod = caster.int_mod
+        attack_roll = dice.d20(1, caster.base_attack_bonus + int_mod, caster.rng)
         
         if attack_roll >= target.armor_class:
-            damage = dice.d8()
+            damage = dice.sampler(self.damage_dice).sample(caster.rng)
             target.take_damage(damage)
             return f"A ray of frost strikes {target.name} for {damage} cold damage!"
         else:
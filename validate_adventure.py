@@ -5,6 +5,8 @@ Checks for common errors and structural issues
 import json
 import sys
 import os
+import dice
+from monster import get_template
 
 
 def validate_adventure(filepath):
@@ -61,6 +63,15 @@ def validate_adventure(filepath):
         if data['starting_node_id'] not in node_ids:
             errors.append(f"starting_node_id '{data['starting_node_id']}' not found in nodes")
     
+    # Validate custom monster dice
+    for monster_name, stats in data.get('custom_monsters', {}).items():
+        for field in ('hit_dice', 'damage'):
+            if field in stats:
+                try:
+                    dice.parse(stats[field])
+                except ValueError as e:
+                    errors.append(f"Custom monster '{monster_name}', {field}: {e}")
+    
     # Validate each node
     has_victory = False
     has_defeat = False
@@ -107,15 +118,14 @@ def validate_adventure(filepath):
         
         # Validate monsters
         if 'monsters' in node:
-            valid_monsters = ['goblin', 'orc', 'skeleton', 'giant_spider', 'zombie', 'ogre', 'troll', 'dragon']
             custom_monsters = data.get('custom_monsters', {}).keys()
             monsters = node['monsters']
             if not isinstance(monsters, list):
                 errors.append(f"Node '{node_id}': 'monsters' must be a list")
             else:
                 for monster in monsters:
-                    if monster not in valid_monsters and monster not in custom_monsters:
-                        warnings.append(f"Node '{node_id}': Unknown monster type '{monster}' (not predefined or custom)")
+                    if monster not in custom_monsters and get_template(monster) is None:
+                        errors.append(f"Node '{node_id}': Unknown monster type '{monster}' (not predefined or custom)")
         
         # Validate traps
         if 'traps' in node:
@@ -130,6 +140,11 @@ def validate_adventure(filepath):
                         errors.append(f"Node '{node_id}', Trap {trap_num}: Missing 'dc'")
                     if 'damage' not in trap:
                         errors.append(f"Node '{node_id}', Trap {trap_num}: Missing 'damage'")
+                    else:
+                        try:
+                            dice.parse(trap['damage'])
+                        except ValueError as e:
+                            errors.append(f"Node '{node_id}', Trap {trap_num}: {e}")
                     if 'save_type' in trap:
                         valid_saves = ['reflex', 'fortitude', 'will']
                         if trap['save_type'] not in valid_saves: